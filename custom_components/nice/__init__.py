@@ -3,36 +3,81 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
+import time
 from contextlib import suppress
-from dataclasses import dataclass
-from typing import Any, Awaitable, Callable
+from copy import deepcopy
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import count
+from typing import Any, Awaitable, Callable, Iterable
 
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
     CONF_NAME,
-    EVENT_HOMEASSISTANT_STARTED,
     EVENT_HOMEASSISTANT_STOP,
 )
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, ServiceCall
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
 from nicett6.ciw_helper import CIWHelper
 from nicett6.cover import Cover
 from nicett6.cover_manager import CoverManager
+from nicett6.decode import PctPosResponse, ResponseMessageType
 from nicett6.image_def import ImageDef
 from nicett6.tt6_cover import TT6Cover
 from nicett6.ttbus_device import TTBusDeviceAddress
-from nicett6.utils import AsyncObservable, AsyncObserver
+from nicett6.utils import (
+    MAX_ASPECT_RATIO,
+    MIN_ASPECT_RATIO,
+    AsyncObservable,
+    AsyncObserver,
+)
 
 from .const import (
+    ATTR_ASPECT_RATIO,
+    ATTR_BASELINE,
+    ATTR_COVERS,
+    ATTR_DIRECTION,
+    ATTR_DROP_PERCENT,
+    ATTR_DURATION,
+    ATTR_ELAPSED,
+    ATTR_END_POSITION,
+    ATTR_IMAGE_HEIGHT,
+    ATTR_START_POSITION,
+    ATTR_TIMED_OUT,
+    ATTR_TIMEOUT,
+    ATTR_TOLERANCE,
+    BASELINE_BOTTOM,
+    BASELINE_MIDDLE,
+    BASELINE_TOP,
     CHOICE_ASPECT_RATIO_2_35_1,
     CHOICE_ASPECT_RATIO_4_3,
     CHOICE_ASPECT_RATIO_16_9,
     CHOICE_ASPECT_RATIO_OTHER,
     CONF_ADDRESS,
+    CONF_BACKGROUND_CONNECT,
     CONF_CIW_HELPERS,
+    CONF_CONNECT_TIMEOUT,
     CONF_CONTROLLER,
     CONF_CONTROLLERS,
+    CONF_COORDINATED_MOVES,
     CONF_COVER,
     CONF_COVERS,
     CONF_DROP,
@@ -44,17 +89,56 @@ from .const import (
     CONF_IMAGE_BORDER_BELOW,
     CONF_IMAGE_HEIGHT,
     CONF_MASK_COVER,
+    CONF_MOVING_WRITE_RATE,
     CONF_NODE,
+    CONF_OPTIMISTIC,
+    CONF_POLL_BUDGET,
+    CONF_POS_COMMAND_WINDOW,
     CONF_PRESETS,
     CONF_SCREEN_COVER,
+    CONF_SENSOR_DEADBAND,
     CONF_SERIAL_PORT,
+    CONF_SETTINGS,
+    DEFAULT_COORDINATED_MOVES,
+    DEFAULT_MOVING_WRITE_RATE,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_POLL_BUDGET,
+    DEFAULT_POS_COMMAND_WINDOW,
+    DEFAULT_SENSOR_DEADBAND,
+    DEFAULT_SETTINGS,
     DOMAIN,
+    EVENT_MOTION_FINISHED,
+    EVENT_MOTION_STARTED,
     SERVICE_APPLY_PRESET,
+    SERVICE_MOVE_AND_WAIT,
+    SERVICE_MOVE_COVERS,
     SERVICE_RECONNECT,
+    SERVICE_SET_ASPECT_RATIO,
+    SERVICE_SET_IMAGE_HEIGHT,
+    SIGNAL_ADD_CIW_HELPERS,
+    SIGNAL_ADD_CONTROLLERS,
+    SIGNAL_ADD_COVERS,
+    SIGNAL_REMOVE_CIW_HELPER,
+    SIGNAL_REMOVE_CONTROLLER,
+    SIGNAL_REMOVE_COVER,
+    TRAVEL_DOWN,
+    TRAVEL_STORAGE_KEY,
+    TRAVEL_STORAGE_VERSION,
+    TRAVEL_UP,
 )
 
 PLATFORMS = ["cover", "sensor"]
 
+OPTIONS_UPDATE_COOLDOWN = 1.0
+DOMAIN_SERVICES = (
+    SERVICE_MOVE_AND_WAIT,
+    SERVICE_MOVE_COVERS,
+    SERVICE_RECONNECT,
+    SERVICE_SET_ASPECT_RATIO,
+    SERVICE_SET_IMAGE_HEIGHT,
+)
+TRAVEL_SAVE_DELAY = 30.0
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -64,21 +148,822 @@ async def _await_cancel(task):
         await task
 
 
-class NiceControllerWrapper:
+def get_setting(entry: ConfigEntry, key: str) -> Any:
+    """Get a setting from the entry options, falling back to the default"""
+    return entry.options.get(CONF_SETTINGS, {}).get(key, DEFAULT_SETTINGS[key])
+
+
+class EntityUpdater(AsyncObserver):
+    def __init__(self, handler: Callable[[], Awaitable[None]]):
+        super().__init__()
+        self.handler = handler
+
+    async def update(self, observable: AsyncObservable):
+        await self.handler()
+
+
+@dataclass(eq=False)
+class _DispatchTarget:
+    hass: HomeAssistant
+    name: str
+    handler: Callable[[], Awaitable[None]]
+    task: asyncio.Task | None = None
+    pending: bool = False
+    call_count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+class EntityDispatcher(AsyncObserver):
+    """
+    Passes the notifications of an observable on to entity handlers
+
+    The dispatcher is the single entity observer of the observable and
+    starts each handler in its own task, so the observable (and the bus
+    reader behind it) never waits for Home Assistant. A handler that is
+    still running when notified again runs once more when it finishes.
+    An exception is logged against its handler alone and a slow handler
+    is logged at debug level. The time spent in each handler is kept for
+    the integration diagnostics.
+    """
+
+    SLOW_HANDLER_TIME = 0.1
+
+    def __init__(self, observable: AsyncObservable) -> None:
+        self._targets: list[_DispatchTarget] = []
+        self._observable: AsyncObservable | None = observable
+        observable.attach(self)
+
+    def add(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        handler: Callable[[], Awaitable[None]],
+    ) -> Callable[[], None]:
+        """Add a handler, returning a function that removes it"""
+        target = _DispatchTarget(hass, name, handler)
+        self._targets.append(target)
+
+        def remove() -> None:
+            if target in self._targets:
+                self._targets.remove(target)
+            if target.task is not None:
+                target.task.cancel()
+
+        return remove
+
+    @property
+    def handler_times(self) -> dict[str, dict[str, float]]:
+        """The number of calls and the total and max time of each handler"""
+        return {
+            target.name: {
+                "count": target.call_count,
+                "total": target.total_time,
+                "max": target.max_time,
+            }
+            for target in self._targets
+            if target.call_count > 0
+        }
+
+    async def update(self, observable: AsyncObservable) -> None:
+        for target in self._targets:
+            if target.task is not None and not target.task.done():
+                target.pending = True
+            else:
+                target.task = target.hass.async_create_task(self._run(target))
+
+    async def _run(self, target: _DispatchTarget) -> None:
+        target.pending = True
+        while target.pending:
+            target.pending = False
+            start = time.perf_counter()
+            try:
+                await target.handler()
+            except Exception:
+                _LOGGER.exception(f"Error updating {target.name}")
+            elapsed = time.perf_counter() - start
+            target.call_count += 1
+            target.total_time += elapsed
+            target.max_time = max(target.max_time, elapsed)
+            if elapsed > self.SLOW_HANDLER_TIME:
+                _LOGGER.debug(f"Updating {target.name} took {elapsed:.3f}s")
+
+    def close(self) -> None:
+        if self._observable is not None:
+            self._observable.detach(self)
+            self._observable = None
+        for target in self._targets:
+            if target.task is not None:
+                target.task.cancel()
+        self._targets = []
+
+
+class StateWriteThrottle:
+    """
+    Limits the rate at which an entity writes its state while moving
+
+    A write at rest is made straight away; while moving, writes that come
+    closer together than 1 / rate are combined into one that is made when
+    the interval has passed and so writes the latest state
+
+    The caller passes the state that it shows with each write; a write of
+    the state that was last written is skipped
+    """
+
+    def __init__(self, write: Callable[[], None], rate: Callable[[], float]):
+        self._write = write
+        self._rate = rate
+        self._last_write: float = -math.inf
+        self._pending: asyncio.TimerHandle | None = None
+        self._state: tuple | None = None
+        self.written_state: tuple | None = None
+
+    def write(self, is_moving: bool, state: tuple) -> None:
+        self._state = state
+        if state == self.written_state:
+            self.cancel()
+            return
+        if self._pending is not None and is_moving:
+            return
+        rate = self._rate()
+        loop = asyncio.get_running_loop()
+        delay = self._last_write + 1.0 / rate - loop.time() if rate > 0.0 else 0.0
+        if not is_moving or delay <= 0.0:
+            self._write_now()
+        else:
+            self._pending = loop.call_later(delay, self._write_now)
+
+    def _write_now(self) -> None:
+        self.cancel()
+        self._last_write = asyncio.get_running_loop().time()
+        self.written_state = self._state
+        self._write()
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+
+class PosCommandCoalescer:
+    """
+    Sends position commands for a Cover, latest target wins
+
+    The first command is sent straight away and opens a window during which
+    later commands only replace the pending target; the pending target is
+    sent when the window closes, which opens another window
+
+    Every command returns once the target that replaced it has been sent,
+    or raises if that failed or was discarded
+    """
+
+    def __init__(self, send: Callable[[int], Awaitable[None]], window: float):
+        self._send = send
+        self.window = window
+        self._pending_pos: int | None = None
+        self._pending_sent: asyncio.Future | None = None
+        self._window_task: asyncio.Task | None = None
+
+    async def send_pos_command(self, pos: int) -> None:
+        if self._window_task is not None and not self._window_task.done():
+            self._pending_pos = pos
+            if self._pending_sent is None:
+                self._pending_sent = asyncio.get_running_loop().create_future()
+            # Shielded as the future is shared with the commands replaced
+            await asyncio.shield(self._pending_sent)
+        else:
+            # Opened first so that commands made while sending are held back
+            if self.window > 0:
+                self._window_task = asyncio.create_task(self._run_window())
+            await self._send(pos)
+
+    def discard_pending(self) -> None:
+        """Forget any target that has not been sent yet"""
+        self._pending_pos = None
+        if self._pending_sent is not None:
+            self._pending_sent.set_exception(
+                HomeAssistantError("Position command superseded")
+            )
+            self._pending_sent = None
+
+    async def _run_window(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            if self._pending_pos is None or self._pending_sent is None:
+                return
+            pos, sent = self._pending_pos, self._pending_sent
+            self._pending_pos = None
+            self._pending_sent = None
+            try:
+                await self._send(pos)
+            except asyncio.CancelledError:
+                sent.cancel()
+                raise
+            except Exception as err:
+                sent.set_exception(err)
+            else:
+                sent.set_result(None)
+
+    async def close(self) -> None:
+        self._pending_pos = None
+        if self._pending_sent is not None:
+            self._pending_sent.cancel()
+            self._pending_sent = None
+        if self._window_task is not None:
+            await _await_cancel(self._window_task)
+            self._window_task = None
+
+
+@dataclass(order=True)
+class _ScheduledCommand:
+    priority: int
+    seq: int
+    key: Any = field(compare=False)
+    send: Callable[[], Awaitable[None]] = field(compare=False)
+    queued_at: float = field(compare=False)
+    done: asyncio.Future = field(compare=False)
+
+
+class CommandScheduler:
+    """
+    Sends the commands for a controller one at a time in priority order
+
+    A queued command is superseded by a later command with the same key
+    When the queue is full the oldest command with the lowest priority is
+    dropped if the new command has a higher priority, otherwise the new
+    command is refused; a stop is never refused
+    A command that is superseded, dropped or refused raises an error
+    """
+
+    PRIORITY_STOP: int = 0
+    PRIORITY_MOVE: int = 1
+    PRIORITY_POLL: int = 2
+
+    MAX_QUEUE_SIZE: int = 32
+    WAIT_TIME_SMOOTHING: float = 0.2
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._queue: list[_ScheduledCommand] = []
+        self._seq = count()
+        self._wakeup = asyncio.Event()
+        self._worker_task: asyncio.Task | None = None
+        self.average_wait_time: float = 0.0
+        self.dropped_count: int = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    async def submit(
+        self, priority: int, key: Any, send: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Queue a command and wait until it has been sent"""
+        loop = asyncio.get_running_loop()
+        command = _ScheduledCommand(
+            priority, next(self._seq), key, send, loop.time(), loop.create_future()
+        )
+        for queued in [c for c in self._queue if c.key == key]:
+            self._discard(queued, "superseded")
+        if len(self._queue) >= self.MAX_QUEUE_SIZE:
+            victim = max(self._queue, key=lambda c: (c.priority, -c.seq))
+            if victim.priority > priority:
+                self._drop(victim)
+                self._discard(victim, "dropped as the queue is full")
+            elif priority != self.PRIORITY_STOP:
+                self._drop(command)
+                raise HomeAssistantError(
+                    f"Nice Controller {self.name}: queue full, {key} refused"
+                )
+        self._queue.append(command)
+        self._wakeup.set()
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._run())
+        await command.done
+
+    def _drop(self, command: _ScheduledCommand) -> None:
+        _LOGGER.warning(
+            f"Nice Controller {self.name}: queue full, dropping {command.key}"
+        )
+        self.dropped_count += 1
+
+    def _discard(self, command: _ScheduledCommand, reason: str) -> None:
+        self._queue.remove(command)
+        if not command.done.done():
+            command.done.set_exception(
+                HomeAssistantError(
+                    f"Nice Controller {self.name}: {command.key} {reason}"
+                )
+            )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            command = min(self._queue)
+            self._queue.remove(command)
+            self.average_wait_time += self.WAIT_TIME_SMOOTHING * (
+                loop.time() - command.queued_at - self.average_wait_time
+            )
+            try:
+                await command.send()
+            except asyncio.CancelledError:
+                # The scheduler is closing; close() only sees the queue
+                command.done.cancel()
+                raise
+            except Exception as err:
+                if not command.done.done():
+                    command.done.set_exception(err)
+            else:
+                if not command.done.done():
+                    command.done.set_result(None)
+
+    async def close(self) -> None:
+        if self._worker_task is not None:
+            await _await_cancel(self._worker_task)
+            self._worker_task = None
+        for command in self._queue:
+            command.done.cancel()
+        self._queue = []
+
+
+class PollBudget:
+    """
+    Shares a rate of position requests between the Covers of a controller
+
+    A rate of 0 turns polling off
+    """
+
+    def __init__(self, rate: float = DEFAULT_POLL_BUDGET) -> None:
+        self.rate = rate
+        self._next_slot: float = -math.inf
+
+    async def acquire(self) -> None:
+        """Wait for the next free slot"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        await asyncio.sleep(slot - now)
+
+
+class MotionPoller(AsyncObserver):
+    """
+    Polls the position of a Cover while it moves
+
+    Polling is off while the Cover is at rest and starts as soon as the
+    Cover is seen to go up or down; it stops once the responses to two
+    polls in a row give the same position. Every position response counts
+    as movement in nicett6, so polling a Cover that has stopped would keep
+    it from coming to rest. Every poll waits for a slot in the budget of
+    the controller.
+    """
+
+    INTERVAL: float = 0.5
+
+    def __init__(
+        self,
+        cover: Cover,
+        poll: Callable[[], Awaitable[bool]],
+        budget: PollBudget,
+    ) -> None:
+        self._cover = cover
+        self._poll = poll
+        self._budget = budget
+        self._task: asyncio.Task | None = None
+        cover.attach(self)
+
+    @property
+    def is_polling(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def update(self, observable: AsyncObservable) -> None:
+        if self._budget.rate <= 0.0:
+            return
+        if self._cover.is_going_up or self._cover.is_going_down:
+            if not self.is_polling:
+                self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        # The position seen before a poll is the response to the one before
+        last_pos: int | None = None
+        polled = False
+        while True:
+            await asyncio.sleep(self.INTERVAL)
+            if self._budget.rate <= 0.0:
+                return
+            if polled:
+                if self._cover.pos == last_pos:
+                    return
+                last_pos = self._cover.pos
+            polled = True
+            await self._budget.acquire()
+            try:
+                if not await self._poll():
+                    return
+            except Exception as err:
+                _LOGGER.debug(f"Polling {self._cover.name} failed: {err}")
+                return
+
+    async def close(self) -> None:
+        self._cover.detach(self)
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+class TravelModel(AsyncObserver):
+    """
+    Learns how fast a Cover travels, in pos units per second
+
+    The rates up and down are each an EWMA of the rate between consecutive
+    position reports while the Cover moves in one direction. Between
+    reports the position is interpolated from the last report.
+    """
+
+    SMOOTHING: float = 0.3
+    MAX_REPORT_GAP: float = 2.0
+
+    def __init__(self, cover: Cover) -> None:
+        self._cover = cover
+        self.rates: dict[str, float | None] = {TRAVEL_UP: None, TRAVEL_DOWN: None}
+        self.target_pos: int | None = None
+        self.on_change: Callable[[], None] | None = None
+        self._last_report: tuple[int, float] | None = None
+        self._direction: str | None = None
+        cover.attach(self)
+
+    async def update(self, observable: AsyncObservable) -> None:
+        if not self._cover.is_moving:
+            self._last_report = None
+            self._direction = None
+            self.target_pos = None
+            return
+        now = time.monotonic()
+        pos = self._cover.pos
+        direction = None
+        if self._last_report is not None:
+            last_pos, last_time = self._last_report
+            if pos == last_pos:
+                return
+            direction = TRAVEL_UP if pos > last_pos else TRAVEL_DOWN
+            elapsed = now - last_time
+            if direction == self._direction and 0.0 < elapsed <= self.MAX_REPORT_GAP:
+                self._learn(direction, abs(pos - last_pos) / elapsed)
+        self._direction = direction
+        self._last_report = (pos, now)
+
+    def _learn(self, direction: str, rate: float) -> None:
+        prev_rate = self.rates[direction]
+        self.rates[direction] = (
+            rate
+            if prev_rate is None
+            else prev_rate + self.SMOOTHING * (rate - prev_rate)
+        )
+        if self.on_change is not None:
+            self.on_change()
+
+    def expected_pos(self) -> float:
+        """The position expected now, interpolated from the last report"""
+        if self._last_report is None or self._direction is None:
+            return float(self._cover.pos)
+        rate = self.rates[self._direction]
+        if rate is None:
+            return float(self._cover.pos)
+        last_pos, last_time = self._last_report
+        step = rate * (time.monotonic() - last_time)
+        if self._direction == TRAVEL_UP:
+            pos = last_pos + step
+            if self.target_pos is not None and self.target_pos >= last_pos:
+                pos = min(pos, self.target_pos)
+        else:
+            pos = last_pos - step
+            if self.target_pos is not None and self.target_pos <= last_pos:
+                pos = max(pos, self.target_pos)
+        return min(max(pos, 0.0), 1000.0)
+
+    def time_to_target(self) -> float | None:
+        """Seconds until the target is reached, or None if not known"""
+        if self.target_pos is None:
+            return None if self._cover.is_moving else 0.0
+        return self.travel_time(self.target_pos)
+
+    def travel_time(self, target_pos: int) -> float | None:
+        """Seconds to travel to target_pos, or None if the rate is not known"""
+        distance = target_pos - self.expected_pos()
+        if abs(distance) < 1.0:
+            return 0.0
+        rate = self.rates[TRAVEL_UP if distance > 0.0 else TRAVEL_DOWN]
+        return None if not rate else abs(distance) / rate
+
+    def close(self) -> None:
+        self._cover.detach(self)
+
+
+class MotionEventTracker:
+    """
+    Fires an event when a Cover starts to move and another when it is at rest
+
+    The move starts when the Cover is first seen going up or down and ends
+    at the last change of position before the Cover comes to rest
+
+    Nothing is fired until the Cover has been seen at rest with a reported
+    position, so the first report, which changes the pos from its default,
+    is not taken for a move
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, nice_cover: NiceCoverData, entity_id: str
+    ) -> None:
+        self._hass = hass
+        self._nice_cover = nice_cover
+        self._cover = nice_cover.cover
+        self._entity_id = entity_id
+        self._rest_pos: int | None = (
+            self._cover.pos if self._is_reported_at_rest() else None
+        )
+        self._start_time: float | None = None
+        self._last_move: tuple[int, float] | None = None
+
+    def _is_reported_at_rest(self) -> bool:
+        return self._nice_cover.state_reported and not self._cover.is_moving
+
+    def _event_data(self) -> dict[str, Any]:
+        return {
+            ATTR_ENTITY_ID: self._entity_id,
+            CONF_NAME: self._cover.name,
+            ATTR_START_POSITION: self._rest_pos / 10.0,
+        }
+
+    async def handle_update(self) -> None:
+        now = time.monotonic()
+        cover = self._cover
+        if self._rest_pos is None:
+            if self._is_reported_at_rest():
+                self._rest_pos = cover.pos
+            return
+        if not cover.is_moving:
+            if self._start_time is not None and self._last_move is not None:
+                end_pos, end_time = self._last_move
+                self._hass.bus.async_fire(
+                    EVENT_MOTION_FINISHED,
+                    {
+                        **self._event_data(),
+                        ATTR_END_POSITION: end_pos / 10.0,
+                        ATTR_DURATION: round(end_time - self._start_time, 3),
+                    },
+                )
+            self._start_time = None
+            self._last_move = None
+            self._rest_pos = cover.pos
+        elif self._start_time is None:
+            if cover.is_going_up or cover.is_going_down:
+                self._start_time = now
+                self._last_move = (cover.pos, now)
+                self._hass.bus.async_fire(
+                    EVENT_MOTION_STARTED,
+                    {
+                        **self._event_data(),
+                        ATTR_DIRECTION: (
+                            TRAVEL_UP if cover.is_going_up else TRAVEL_DOWN
+                        ),
+                    },
+                )
+        elif self._last_move is None or cover.pos != self._last_move[0]:
+            self._last_move = (cover.pos, now)
+
+
+class ArrivalWaiter(AsyncObserver):
+    """
+    Waits for a Cover to come to rest within tolerance of a target pos
+
+    The Cover is observed directly so that the wait ends as soon as it is
+    notified to be at rest, without going through the state machine; a
+    Cover that has not reported its position yet has not arrived
+    """
+
+    def __init__(
+        self, nice_cover: NiceCoverData, target_pos: int, tolerance: int
+    ) -> None:
+        self._nice_cover = nice_cover
+        self._cover = nice_cover.cover
+        self._target_pos = target_pos
+        self._tolerance = tolerance
+        self._arrived = asyncio.Event()
+
+    @property
+    def has_arrived(self) -> bool:
+        cover = self._cover
+        return (
+            self._nice_cover.state_reported
+            and not cover.is_moving
+            and abs(cover.pos - self._target_pos) <= self._tolerance
+        )
+
+    async def update(self, observable: AsyncObservable) -> None:
+        if self.has_arrived:
+            self._arrived.set()
+
+    async def wait(self, send: Awaitable[None], timeout: float) -> bool:
+        """Await send and then arrival, returning False on timeout"""
+        self._cover.attach(self)
+        try:
+            async with asyncio.timeout(timeout):
+                await send
+                if not self.has_arrived:
+                    await self._arrived.wait()
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self._cover.detach(self)
+
+
+class NiceControllerWrapper(AsyncObservable):
+    """
+    Wraps the CoverManager for a Nice TT6 Controller
+
+    Observers are notified when the controller has connected
+    """
+
+    RETRY_INTERVAL_MIN: float = 5.0
+    RETRY_INTERVAL_MAX: float = 300.0
+    POS_REQUEST_INTERVAL: float = 0.1
+    SYNC_TIMEOUT: float = 5.0
+
     def __init__(self, name: str, serial_port: str) -> None:
+        super().__init__()
         self.name = name
         self._controller = CoverManager(serial_port)
+        self.scheduler = CommandScheduler(name)
+        self.poll_budget = PollBudget()
+        self._covers: dict[TTBusDeviceAddress, Cover] = {}
+        self.tt6_covers: dict[TTBusDeviceAddress, TT6Cover] = {}
+        self.is_connected: bool = False
+        self._connect_task: asyncio.Task | None = None
         self._message_tracker_task: asyncio.Task | None = None
         self._undo_listener: CALLBACK_TYPE | None = None
+        self._sync_task: asyncio.Task | None = None
+        self._awaiting_pos: set[TTBusDeviceAddress] = set()
+        self.reported: set[TTBusDeviceAddress] = set()
+        self.positions_synced = asyncio.Event()
+        self.positions_synced.set()
+
+    def define_cover(self, tt_addr: TTBusDeviceAddress, cover: Cover) -> None:
+        """Define a Cover to be added to the controller when it is started"""
+        self._covers[tt_addr] = cover
+
+    async def _add_tt6_cover(self, tt_addr: TTBusDeviceAddress) -> None:
+        # NOTE: CoverManager.add_cover sends a position request
+        tt6_cover = await self._controller.add_cover(tt_addr, self._covers[tt_addr])
+        handle_response_message = tt6_cover.handle_response_message
+
+        async def handle_response_message_and_track(msg: ResponseMessageType):
+            # Only a position response counts as reported, not an Ack, and it
+            # is recorded first so that the observers notified see it
+            is_pos = isinstance(msg, PctPosResponse)
+            if is_pos:
+                self.reported.add(tt_addr)
+            await handle_response_message(msg)
+            if is_pos:
+                self._pos_reported(tt_addr)
+
+        tt6_cover.handle_response_message = handle_response_message_and_track
+        self.tt6_covers[tt_addr] = tt6_cover
+
+    async def connect_cover(self, tt_addr: TTBusDeviceAddress) -> None:
+        """Add a defined Cover to the controller if it is already connected"""
+        if self.is_connected:
+            await self._add_tt6_cover(tt_addr)
+
+    async def remove_cover(self, tt_addr: TTBusDeviceAddress) -> None:
+        """Remove a Cover without disturbing the other Covers on the controller"""
+        del self._covers[tt_addr]
+        self.reported.discard(tt_addr)
+        self._pos_reported(tt_addr)
+        tt6_cover = self.tt6_covers.pop(tt_addr, None)
+        if tt6_cover is not None:
+            # NOTE: CoverManager can only remove all of its covers at once so the
+            # TT6Cover stays registered with it until the controller is closed
+            await tt6_cover.stop_notifier()
 
     async def start(self, hass: HomeAssistant):
         await self._controller.open()
+        for tt_addr in list(self._covers):
+            self._awaiting_pos.add(tt_addr)
+            await self._add_tt6_cover(tt_addr)
+
+        # Track messages straight away rather than waiting for Home Assistant
+        # to start so that the covers have a known state as soon as possible
+        await self.start_messages(hass)
+        self.sync_positions()
+
+        self.is_connected = True
+        await self.notify_observers()
+
+    def sync_positions(self) -> asyncio.Task:
+        """
+        Request the position of every Cover on the controller
 
-        async def handle_started(event: Event) -> None:
-            _LOGGER.debug(f"Started Event for Nice Controller {self.name}")
-            await self.start_messages(hass)
+        A sync that is already in progress is joined rather than repeated
+        Await the returned task or wait on positions_synced for completion
+        """
+        if self._sync_task is None or self._sync_task.done():
+            # Skip any Covers that already have a request in flight
+            tt6_covers = [
+                tt6_cover
+                for tt_addr, tt6_cover in self.tt6_covers.items()
+                if tt_addr not in self._awaiting_pos
+            ]
+            self._awaiting_pos.update(tt6_cover.tt_addr for tt6_cover in tt6_covers)
+            self.positions_synced.clear()
+            self._sync_task = asyncio.create_task(self._sync_positions(tt6_covers))
+        return self._sync_task
 
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, handle_started)
+    async def _sync_positions(self, tt6_covers: list[TT6Cover]) -> None:
+        try:
+            for tt6_cover in tt6_covers:
+                with suppress(HomeAssistantError):
+                    # Superseded by another request for the same position
+                    await self.send_pos_request(tt6_cover)
+                await asyncio.sleep(self.POS_REQUEST_INTERVAL)
+            if self._awaiting_pos:
+                await asyncio.wait_for(self.positions_synced.wait(), self.SYNC_TIMEOUT)
+        except asyncio.TimeoutError:
+            names = [self._covers[tt_addr].name for tt_addr in self._awaiting_pos]
+            _LOGGER.warning(
+                f"Nice Controller {self.name}: no position reported for {names}"
+            )
+        finally:
+            self._awaiting_pos.clear()
+            self.positions_synced.set()
+
+    async def send_pos_request(self, tt6_cover: TT6Cover) -> None:
+        await self.scheduler.submit(
+            CommandScheduler.PRIORITY_POLL,
+            (tt6_cover.tt_addr, "pos_request"),
+            tt6_cover.send_pos_request,
+        )
+
+    async def send_pos_command(self, tt6_cover: TT6Cover, pos: int) -> None:
+        await self.scheduler.submit(
+            CommandScheduler.PRIORITY_MOVE,
+            (tt6_cover.tt_addr, "command"),
+            partial(tt6_cover.send_pos_command, pos),
+        )
+
+    async def send_simple_command(self, tt6_cover: TT6Cover, cmd_name: str) -> None:
+        await self.scheduler.submit(
+            CommandScheduler.PRIORITY_STOP
+            if cmd_name == "STOP"
+            else CommandScheduler.PRIORITY_MOVE,
+            (tt6_cover.tt_addr, "command"),
+            partial(tt6_cover.send_simple_command, cmd_name),
+        )
+
+    def _pos_reported(self, tt_addr: TTBusDeviceAddress) -> None:
+        self._awaiting_pos.discard(tt_addr)
+        if not self._awaiting_pos:
+            self.positions_synced.set()
+
+    async def connect(self, hass: HomeAssistant, connect_timeout: float) -> None:
+        """Start the controller, giving up after connect_timeout seconds"""
+        try:
+            await asyncio.wait_for(self.start(hass), connect_timeout)
+        except BaseException:
+            await self._stop()
+            raise
+
+    def connect_in_background(
+        self, hass: HomeAssistant, connect_timeout: float
+    ) -> None:
+        """Keep trying to connect in a background task until successful"""
+        self._connect_task = hass.async_create_background_task(
+            self._connect_with_retry(hass, connect_timeout),
+            f"Connect Nice Controller {self.name}",
+        )
+
+    async def _connect_with_retry(
+        self, hass: HomeAssistant, connect_timeout: float
+    ) -> None:
+        retry_interval = self.RETRY_INTERVAL_MIN
+        while True:
+            try:
+                await self.connect(hass, connect_timeout)
+            except Exception as err:
+                _LOGGER.warning(
+                    f"Unable to open Nice Controller {self.name}: {err!r}; "
+                    f"retrying in {retry_interval} seconds"
+                )
+            else:
+                _LOGGER.info(f"Nice Controller {self.name} connected")
+                return
+            await asyncio.sleep(retry_interval)
+            retry_interval = min(2.0 * retry_interval, self.RETRY_INTERVAL_MAX)
 
     async def start_messages(self, hass: HomeAssistant):
         self._message_tracker_task = asyncio.create_task(
@@ -87,38 +972,50 @@ class NiceControllerWrapper:
 
         async def handle_stop(event: Event) -> None:
             _LOGGER.debug(f"Stop Event for Nice Controller {self.name}")
+            self._undo_listener = None
             await self._stop()
 
         self._undo_listener = hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_STOP, handle_stop
         )
 
-    async def add_cover(self, *args) -> TT6Cover:
-        return await self._controller.add_cover(*args)
-
     async def reconnect(self):
-        await self._controller.reconnect()
+        if self.is_connected:
+            await self._controller.reconnect()
+            await self.sync_positions()
+
+    async def change_serial_port(
+        self, hass: HomeAssistant, serial_port: str, connect_timeout: float
+    ) -> None:
+        """Switch to a different serial port, reconnecting in the background"""
+        await self.stop()
+        self._controller = CoverManager(serial_port)
+        await self.notify_observers()
+        self.connect_in_background(hass, connect_timeout)
 
     async def _stop(self):
-        await _await_cancel(self._message_tracker_task)
+        if self._sync_task is not None:
+            await _await_cancel(self._sync_task)
+            self._sync_task = None
+        if self._message_tracker_task is not None:
+            await _await_cancel(self._message_tracker_task)
+            self._message_tracker_task = None
+        await self.scheduler.close()
         await self._controller.close()
+        self.tt6_covers = {}
+        self.is_connected = False
 
     async def stop(self) -> None:
         _LOGGER.debug(f"Stopping Nice Controller {self.name}")
+        if self._connect_task is not None:
+            await _await_cancel(self._connect_task)
+            self._connect_task = None
         if self._undo_listener is not None:
             self._undo_listener()
+            self._undo_listener = None
         await self._stop()
 
 
-async def make_nice_controller_wrapper(
-    hass: HomeAssistant, name: str, serial_port: str
-) -> NiceControllerWrapper:
-    """Factory for NiceControllerWrapper objects"""
-    wrapper = NiceControllerWrapper(name, serial_port)
-    await wrapper.start(hass)
-    return wrapper
-
-
 def image_aspect_ratio_from_config_params(choice: str, other: float) -> float:
     if choice == CHOICE_ASPECT_RATIO_16_9:
         return 16 / 9
@@ -149,16 +1046,347 @@ def image_def_from_config(cover_config) -> ImageDef | None:
 
 @dataclass
 class NiceCoverData:
-    tt6_cover: TT6Cover
+    controller: NiceControllerWrapper
+    tt_addr: TTBusDeviceAddress
+    cover: Cover
     has_reverse_semantics: bool
     image_def: ImageDef | None
+    pos_command_window: float = DEFAULT_POS_COMMAND_WINDOW
+    moving_write_rate: float = DEFAULT_MOVING_WRITE_RATE
+    sensor_deadband: float = DEFAULT_SENSOR_DEADBAND
+    optimistic: bool = DEFAULT_OPTIMISTIC
+    coordinated_moves: bool = DEFAULT_COORDINATED_MOVES
 
+    def __post_init__(self) -> None:
+        self.dispatcher = EntityDispatcher(self.cover)
+        self.pos_commands = PosCommandCoalescer(
+            self._send_pos_command, self.pos_command_window
+        )
+        self.poller = MotionPoller(self.cover, self._poll, self.controller.poll_budget)
+        self.travel = TravelModel(self.cover)
+
+    @property
+    def state_reported(self) -> bool:
+        """True once the controller has reported the position of the Cover"""
+        return self.tt_addr in self.controller.reported
+
+    @property
+    def tt6_cover(self) -> TT6Cover | None:
+        """The TT6Cover, or None if the controller has not connected yet"""
+        return self.controller.tt6_covers.get(self.tt_addr)
+
+    async def send_pos_command(self, pos: int) -> None:
+        """Move to pos, superseding any target that has not been sent yet"""
+        self.travel.target_pos = pos
+        await self.pos_commands.send_pos_command(pos)
+
+    async def send_simple_command(self, cmd_name: str) -> None:
+        """Send a simple command, which supersedes any pending target"""
+        self.pos_commands.discard_pending()
+        self.travel.target_pos = {"MOVE_UP": 1000, "MOVE_DOWN": 0}.get(cmd_name)
+        await self.controller.send_simple_command(self.tt6_cover, cmd_name)
+
+    async def send_pos_request(self) -> None:
+        await self.controller.send_pos_request(self.tt6_cover)
+
+    async def _poll(self) -> bool:
+        """Request the position, returning False if not connected"""
+        tt6_cover = self.tt6_cover
+        if tt6_cover is None:
+            return False
+        await self.controller.send_pos_request(tt6_cover)
+        return True
+
+    async def _send_pos_command(self, pos: int) -> None:
+        tt6_cover = self.tt6_cover
+        if tt6_cover is None:
+            raise HomeAssistantError(
+                f"Nice Controller {self.controller.name} not connected"
+            )
+        await self.controller.send_pos_command(tt6_cover, pos)
+
+    async def close(self) -> None:
+        """Stop observing the Cover, which may outlive this data"""
+        self.travel.close()
+        self.dispatcher.close()
+        await self.poller.close()
+        await self.pos_commands.close()
+
+
+PosCommandGroups = dict[NiceControllerWrapper, list[tuple[NiceCoverData, int]]]
+
+
+def pos_from_drop(drop: float, max_drop: float) -> int:
+    return round(1000.0 * (1.0 - drop / max_drop))
+
+
+def group_by_controller(
+    targets: Iterable[tuple[NiceCoverData, int]]
+) -> PosCommandGroups:
+    groups: PosCommandGroups = {}
+    for nice_cover, pos in targets:
+        groups.setdefault(nice_cover.controller, []).append((nice_cover, pos))
+    return groups
+
+
+def arrival_delays(groups: PosCommandGroups) -> dict[int, float]:
+    """
+    The delay before sending each command (keyed by the id of the Cover data)
+    for a coordinated move
+
+    Empty if the move is not coordinated or if a travel rate is not known yet
+    """
+    targets = [target for group in groups.values() for target in group]
+    if not all(nice_cover.coordinated_moves for nice_cover, _ in targets):
+        return {}
+    travel_times = {
+        id(nice_cover): (
+            nice_cover.travel.travel_time(pos) if nice_cover.state_reported else None
+        )
+        for nice_cover, pos in targets
+    }
+    if any(travel_time is None for travel_time in travel_times.values()):
+        return {}
+    longest = max(travel_times.values(), default=0.0)
+    return {key: longest - travel_time for key, travel_time in travel_times.items()}
+
+
+async def async_send_pos_commands(groups: PosCommandGroups) -> None:
+    """
+    Send position commands to many Covers
+
+    The commands for each controller are sent in order while the controllers
+    are sent to concurrently; every failure is reported once all are done
+
+    For a coordinated move, the command for each Cover is held back by the
+    difference between its travel time and that of the slowest Cover, so
+    that they all arrive together without slowing the move down
+    """
+    delays = arrival_delays(groups)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def send_group(group: list[tuple[NiceCoverData, int]]) -> dict[str, Any]:
+        failures = {}
+        for nice_cover, pos in sorted(group, key=lambda t: delays.get(id(t[0]), 0.0)):
+            delay = start + delays.get(id(nice_cover), 0.0) - loop.time()
+            if delay > 0.0:
+                await asyncio.sleep(delay)
+            try:
+                await nice_cover.send_pos_command(pos)
+            except Exception as err:
+                failures[nice_cover.cover.name] = err
+        return failures
+
+    failures = {}
+    for group_failures in await asyncio.gather(
+        *(send_group(group) for group in groups.values())
+    ):
+        failures.update(group_failures)
+    if failures:
+        raise HomeAssistantError(
+            "Unable to move "
+            + ", ".join(f"{name} ({err})" for name, err in failures.items())
+        )
+
+
+@dataclass(frozen=True)
+class CIWGeometry:
+    """
+    The fixed dimensions of a CIW Helper
+
+    Drops are measured down from the roller; the reference image area is
+    where the image area sits when the screen is fully down
+    """
+
+    screen_max_drop: float
+    mask_max_drop: float
+    border_below: float
+    image_height: float
+    image_width: float
+
+    @classmethod
+    def from_helper(cls, ciw_helper: CIWHelper) -> CIWGeometry:
+        return cls(
+            ciw_helper.screen.max_drop,
+            ciw_helper.mask.max_drop,
+            ciw_helper.image_def.bottom_border_height,
+            ciw_helper.image_def.height,
+            ciw_helper.image_def.width,
+        )
+
+    def solve(self, image_height: float, baseline: str) -> tuple[float, float]:
+        """
+        Return the screen and mask drops that show an image of image_height
+
+        The baseline is the edge (or the middle) of the reference image area
+        that the image is aligned with; the image moves up if the mask is
+        too short to reach
+        """
+        if not 0.1 * self.image_height < image_height <= self.image_height:
+            raise HomeAssistantError(
+                f"Image height {image_height} must be more than 10% of "
+                f"{self.image_height} and no more than {self.image_height}"
+            )
+        reference_bottom = self.screen_max_drop - self.border_below
+        if baseline == BASELINE_BOTTOM:
+            image_bottom = reference_bottom
+        elif baseline == BASELINE_TOP:
+            image_bottom = reference_bottom - self.image_height + image_height
+        elif baseline == BASELINE_MIDDLE:
+            image_bottom = reference_bottom - (self.image_height - image_height) / 2
+        else:
+            raise ValueError("Invalid baseline")
+        mask_drop = min(image_bottom - image_height, self.mask_max_drop)
+        screen_drop = mask_drop + image_height + self.border_below
+        return screen_drop, mask_drop
+
+    def solve_aspect_ratio(
+        self, aspect_ratio: float, baseline: str
+    ) -> tuple[float, float]:
+        return self.solve(
+            min(self.image_width / aspect_ratio, self.image_height), baseline
+        )
+
+
+@dataclass(frozen=True)
+class CIWValues:
+    """The image dimensions of a CIW Helper for one pair of drops"""
+
+    image_height: float | None
+    image_width: float
+    image_diagonal: float | None
+    aspect_ratio: float | None
+
+    @classmethod
+    def from_helper(cls, ciw_helper: CIWHelper) -> CIWValues:
+        return cls(
+            ciw_helper.image_height,
+            ciw_helper.image_width,
+            ciw_helper.image_diagonal,
+            ciw_helper.aspect_ratio,
+        )
+
+
+@dataclass(eq=False)
+class NiceCIWData(AsyncObservable):
+    """A CIW Helper; observers are notified when its values are recomputed"""
 
-@dataclass
-class NiceCIWData:
     name: str
     screen_cover_id: str
     ciw_helper: CIWHelper
+    screen: NiceCoverData
+    mask: NiceCoverData
+    geometry: CIWGeometry = field(init=False)
+    values: CIWValues = field(init=False)
+    dispatcher: EntityDispatcher = field(init=False)
+
+    def __post_init__(self) -> None:
+        super().__init__()
+        self.dispatcher = EntityDispatcher(self)
+        self.geometry = CIWGeometry.from_helper(self.ciw_helper)
+        self.values = CIWValues.from_helper(self.ciw_helper)
+
+    @property
+    def state_reported(self) -> bool:
+        return self.screen.state_reported and self.mask.state_reported
+
+    @property
+    def is_moving(self) -> bool:
+        return self.screen.cover.is_moving or self.mask.cover.is_moving
+
+    @property
+    def moving_write_rate(self) -> float:
+        return self.screen.moving_write_rate
+
+    @property
+    def sensor_deadband(self) -> float:
+        return self.screen.sensor_deadband
+
+    async def move_to(self, screen_drop: float, mask_drop: float) -> None:
+        """Move the screen and the mask at the same time"""
+        await async_send_pos_commands(
+            group_by_controller(
+                [
+                    (nice_cover, pos_from_drop(drop, nice_cover.cover.max_drop))
+                    for nice_cover, drop in (
+                        (self.screen, screen_drop),
+                        (self.mask, mask_drop),
+                    )
+                ]
+            )
+        )
+
+
+class CIWEngine(AsyncObserver):
+    """
+    Computes the image dimensions of all of the CIW Helpers of an entry
+
+    The engine is the only observer of the Covers of the helpers and keeps
+    a note of the helpers that use each Cover; when a Cover moves, each of
+    them is recomputed with its CIWHelper and then notified
+
+    Each helper remembers the (screen.pos, mask.pos) that it was last
+    notified for, so a Cover notification that changes neither position
+    is neither recomputed nor passed on, unless the helper has just come
+    to rest
+    """
+
+    def __init__(self) -> None:
+        self._helpers: list[NiceCIWData] = []
+        self._screen_slots: dict[Cover, list[int]] = {}
+        self._mask_slots: dict[Cover, list[int]] = {}
+        self._notified_pos: list[tuple[int, int, bool] | None] = []
+
+    def add(self, ciw_data: NiceCIWData) -> None:
+        self._helpers.append(ciw_data)
+        self._rebuild()
+
+    def remove(self, ciw_data: NiceCIWData) -> None:
+        self._helpers.remove(ciw_data)
+        self._rebuild()
+
+    def close(self) -> None:
+        self._helpers = []
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        for cover in self._screen_slots.keys() | self._mask_slots.keys():
+            cover.detach(self)
+        self._screen_slots = {}
+        self._mask_slots = {}
+        for slot, ciw_data in enumerate(self._helpers):
+            ciw_helper = ciw_data.ciw_helper
+            self._screen_slots.setdefault(ciw_helper.screen, []).append(slot)
+            self._mask_slots.setdefault(ciw_helper.mask, []).append(slot)
+        for cover in self._screen_slots.keys() | self._mask_slots.keys():
+            cover.attach(self)
+        self._notified_pos = [None] * len(self._helpers)
+        self._compute(range(len(self._helpers)))
+
+    def _compute(self, slots: Iterable[int]) -> None:
+        for slot in slots:
+            ciw_data = self._helpers[slot]
+            ciw_data.values = CIWValues.from_helper(ciw_data.ciw_helper)
+
+    async def update(self, observable: AsyncObservable) -> None:
+        assert isinstance(observable, Cover)
+        slots = []
+        for slot in sorted(
+            {
+                *self._screen_slots.get(observable, []),
+                *self._mask_slots.get(observable, []),
+            }
+        ):
+            ciw_data = self._helpers[slot]
+            ciw_helper = ciw_data.ciw_helper
+            pos = (ciw_helper.screen.pos, ciw_helper.mask.pos, ciw_data.is_moving)
+            if pos != self._notified_pos[slot]:
+                self._notified_pos[slot] = pos
+                slots.append(slot)
+        self._compute(slots)
+        for slot in slots:
+            await self._helpers[slot].notify_observers()
 
 
 class NiceData:
@@ -166,25 +1394,130 @@ class NiceData:
         self.controllers: dict[str, NiceControllerWrapper] = {}
         self.nice_covers: dict[str, NiceCoverData] = {}
         self.ciw_helpers: dict[str, NiceCIWData] = {}
+        self.ciw_engine = CIWEngine()
+        self.presets: dict[str, PosCommandGroups] = {}
+        self.pos_command_window: float = DEFAULT_POS_COMMAND_WINDOW
+        self.moving_write_rate: float = DEFAULT_MOVING_WRITE_RATE
+        self.sensor_deadband: float = DEFAULT_SENSOR_DEADBAND
+        self.optimistic: bool = DEFAULT_OPTIMISTIC
+        self.poll_budget: float = DEFAULT_POLL_BUDGET
+        self.coordinated_moves: bool = DEFAULT_COORDINATED_MOVES
+        self.travel_store: Store | None = None
+        self.travel_rates: dict[str, dict[str, float | None]] = {}
+        self.applied_data: dict[str, Any] = {}
+        self.applied_options: dict[str, Any] = {}
+        self.options_debouncer: Debouncer | None = None
 
-    async def add_controller(self, hass, id, config):
-        controller = await make_nice_controller_wrapper(
-            hass, config[CONF_NAME], config[CONF_SERIAL_PORT]
+    def add_controller(self, id, config):
+        self.controllers[id] = NiceControllerWrapper(
+            config[CONF_NAME], config[CONF_SERIAL_PORT]
         )
-        self.controllers[id] = controller
+        self.controllers[id].poll_budget.rate = self.poll_budget
 
-    async def add_cover(self, id, cover_config):
+    def add_cover(self, id, cover_config):
         controller = self.controllers[cover_config[CONF_CONTROLLER]]
-        tt6_cover = await controller.add_cover(
-            TTBusDeviceAddress(cover_config[CONF_ADDRESS], cover_config[CONF_NODE]),
-            Cover(cover_config[CONF_NAME], cover_config[CONF_DROP]),
+        tt_addr = TTBusDeviceAddress(
+            cover_config[CONF_ADDRESS], cover_config[CONF_NODE]
         )
+        cover = Cover(cover_config[CONF_NAME], cover_config[CONF_DROP])
+        controller.define_cover(tt_addr, cover)
         has_reverse_semantics = cover_config.get(CONF_HAS_REVERSE_SEMANTICS, False)
         self.nice_covers[id] = NiceCoverData(
-            tt6_cover,
+            controller,
+            tt_addr,
+            cover,
             has_reverse_semantics,
             image_def_from_config(cover_config),
+            self.pos_command_window,
+            self.moving_write_rate,
+            self.sensor_deadband,
+            self.optimistic,
+            self.coordinated_moves,
+        )
+        travel = self.nice_covers[id].travel
+        travel.rates.update(self.travel_rates.get(id, {}))
+        travel.on_change = partial(self._travel_rates_changed, id)
+
+    def _travel_rates_changed(self, id) -> None:
+        self.travel_rates[id] = dict(self.nice_covers[id].travel.rates)
+        self._save_travel_rates()
+
+    def _save_travel_rates(self) -> None:
+        if self.travel_store is not None:
+            self.travel_store.async_delay_save(
+                lambda: self.travel_rates, TRAVEL_SAVE_DELAY
+            )
+
+    async def remove_controller(self, id):
+        await self.controllers.pop(id).stop()
+
+    async def remove_cover(self, id):
+        nice_cover = self.nice_covers.pop(id)
+        if self.travel_rates.pop(id, None) is not None:
+            self._save_travel_rates()
+        await nice_cover.close()
+        await nice_cover.controller.remove_cover(nice_cover.tt_addr)
+
+    def set_pos_command_window(self, window: float) -> None:
+        self.pos_command_window = window
+        for nice_cover in self.nice_covers.values():
+            nice_cover.pos_commands.window = window
+
+    def set_moving_write_rate(self, rate: float) -> None:
+        self.moving_write_rate = rate
+        for nice_cover in self.nice_covers.values():
+            nice_cover.moving_write_rate = rate
+
+    def set_sensor_deadband(self, deadband: float) -> None:
+        self.sensor_deadband = deadband
+        for nice_cover in self.nice_covers.values():
+            nice_cover.sensor_deadband = deadband
+
+    def set_optimistic(self, optimistic: bool) -> None:
+        self.optimistic = optimistic
+        for nice_cover in self.nice_covers.values():
+            nice_cover.optimistic = optimistic
+
+    def set_poll_budget(self, rate: float) -> None:
+        self.poll_budget = rate
+        for controller in self.controllers.values():
+            controller.poll_budget.rate = rate
+
+    def set_coordinated_moves(self, coordinated_moves: bool) -> None:
+        self.coordinated_moves = coordinated_moves
+        for nice_cover in self.nice_covers.values():
+            nice_cover.coordinated_moves = coordinated_moves
+
+    async def start_controllers(self, hass, connect_timeout):
+        """Start all of the controllers concurrently
+
+        Controllers that fail to connect keep retrying in the background, so
+        that one dead controller does not take down the others.  Setup is only
+        retried if none of the controllers could be connected."""
+        ids = list(self.controllers.keys())
+        results = await asyncio.gather(
+            *(self.controllers[id].connect(hass, connect_timeout) for id in ids),
+            return_exceptions=True,
         )
+        failed = []
+        for id, result in zip(ids, results):
+            if isinstance(result, BaseException):
+                name = self.controllers[id].name
+                _LOGGER.warning(f"Unable to open Nice Controller {name}: {result!r}")
+                failed.append(id)
+        if failed and len(failed) == len(ids):
+            names = ", ".join(self.controllers[id].name for id in failed)
+            await self.close()
+            raise ConfigEntryNotReady(
+                f"Unable to connect to Nice Controller(s): {names}"
+            )
+        for id in failed:
+            self.controllers[id].connect_in_background(hass, connect_timeout)
+
+    def start_controllers_in_background(self, hass, connect_timeout):
+        """Start all of the controllers without waiting for them to connect"""
+        for controller in self.controllers.values():
+            controller.connect_in_background(hass, connect_timeout)
 
     def add_ciw_helper(self, id, ciw_config):
         screen: NiceCoverData = self.nice_covers[ciw_config[CONF_SCREEN_COVER]]
@@ -193,91 +1526,354 @@ class NiceData:
         self.ciw_helpers[id] = NiceCIWData(
             ciw_config[CONF_NAME],
             ciw_config[CONF_SCREEN_COVER],
-            CIWHelper(screen.tt6_cover.cover, mask.tt6_cover.cover, screen.image_def),
+            CIWHelper(screen.cover, mask.cover, screen.image_def),
+            screen,
+            mask,
         )
+        self.ciw_engine.add(self.ciw_helpers[id])
+
+    def remove_ciw_helper(self, id):
+        ciw_data = self.ciw_helpers.pop(id)
+        self.ciw_engine.remove(ciw_data)
+        ciw_data.dispatcher.close()
+
+    def compile_presets(self, presets_config):
+        """Resolve each Preset to its position commands, grouped by controller"""
+        presets = {}
+        for preset_config in presets_config.values():
+            name = preset_config[CONF_NAME]
+            targets = []
+            for item in preset_config[CONF_DROPS]:
+                nice_cover = self.nice_covers.get(item[CONF_COVER])
+                if nice_cover is None:
+                    _LOGGER.error(f"Preset {name}: unknown Cover {item[CONF_COVER]}")
+                    continue
+                max_drop = nice_cover.cover.max_drop
+                if not 0.0 <= item[CONF_DROP] <= max_drop:
+                    _LOGGER.error(
+                        f"Preset {name}: drop {item[CONF_DROP]} for "
+                        f"{nice_cover.cover.name} is outside 0 to {max_drop}"
+                    )
+                    continue
+                targets.append((nice_cover, pos_from_drop(item[CONF_DROP], max_drop)))
+            presets[name] = group_by_controller(targets)
+        self.presets = presets
 
     async def close(self):
+        self.ciw_engine.close()
+        for ciw_data in self.ciw_helpers.values():
+            ciw_data.dispatcher.close()
         self.ciw_helpers = {}
+        for nice_cover in self.nice_covers.values():
+            await nice_cover.close()
         self.nice_covers = {}
         for controller in self.controllers.values():
             await controller.stop()
         self.controllers = {}
 
 
+@callback
+def _async_add_controller_device(
+    device_registry: dr.DeviceRegistry,
+    entry: ConfigEntry,
+    controller_id: str,
+    controller_config: dict[str, Any],
+) -> None:
+    device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, controller_id)},
+        manufacturer="Nice",
+        name=controller_config[CONF_NAME],
+        model="Nice TT6 Control Unit",
+    )
+
+
+@callback
+def _async_add_cover_device(
+    device_registry: dr.DeviceRegistry,
+    entry: ConfigEntry,
+    cover_id: str,
+    cover_config: dict[str, Any],
+) -> None:
+    device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, cover_id)},
+        name=cover_config[CONF_NAME],
+        manufacturer="Nice",
+        model="Nice Tubular Motor",
+        via_device=(DOMAIN, cover_config[CONF_CONTROLLER]),
+    )
+
+
+@callback
+def _async_remove_from_registries(
+    hass: HomeAssistant, entry: ConfigEntry, id: str
+) -> None:
+    """Remove a device along with any entities whose unique_id starts with id"""
+    entity_registry = er.async_get(hass)
+    for e in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        if e.unique_id.startswith(id):
+            entity_registry.async_remove(e.entity_id)
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_device(identifiers={(DOMAIN, id)})
+    if device is not None:
+        device_registry.async_remove_device(device.id)
+
+
 async def make_nice_data(hass: HomeAssistant, entry: ConfigEntry) -> NiceData:
     """Factory for NiceData object"""
     data = NiceData()
+    data.pos_command_window = get_setting(entry, CONF_POS_COMMAND_WINDOW)
+    data.moving_write_rate = get_setting(entry, CONF_MOVING_WRITE_RATE)
+    data.sensor_deadband = get_setting(entry, CONF_SENSOR_DEADBAND)
+    data.optimistic = get_setting(entry, CONF_OPTIMISTIC)
+    data.poll_budget = get_setting(entry, CONF_POLL_BUDGET)
+    data.coordinated_moves = get_setting(entry, CONF_COORDINATED_MOVES)
+    data.travel_store = Store(
+        hass, TRAVEL_STORAGE_VERSION, TRAVEL_STORAGE_KEY.format(entry.entry_id)
+    )
+    data.travel_rates = await data.travel_store.async_load() or {}
     device_registry = dr.async_get(hass)
 
     for controller_id, controller_config in entry.data[CONF_CONTROLLERS].items():
-        await data.add_controller(hass, controller_id, controller_config)
-        device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, controller_id)},
-            manufacturer="Nice",
-            name=controller_config[CONF_NAME],
-            model="Nice TT6 Control Unit",
+        data.add_controller(controller_id, controller_config)
+        _async_add_controller_device(
+            device_registry, entry, controller_id, controller_config
         )
 
     for cover_id, cover_config in entry.data[CONF_COVERS].items():
-        await data.add_cover(cover_id, cover_config)
-        device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, cover_id)},
-            name=cover_config[CONF_NAME],
-            manufacturer="Nice",
-            model="Nice Tubular Motor",
-            via_device=(DOMAIN, cover_config[CONF_CONTROLLER]),
-        )
+        data.add_cover(cover_id, cover_config)
+        _async_add_cover_device(device_registry, entry, cover_id, cover_config)
 
     if CONF_CIW_HELPERS in entry.options:
         for ciw_id, ciw_config in entry.options[CONF_CIW_HELPERS].items():
             data.add_ciw_helper(ciw_id, ciw_config)
 
-    return data
-
+    data.applied_data = deepcopy(dict(entry.data))
+    data.applied_options = deepcopy(dict(entry.options))
 
-class EntityUpdater(AsyncObserver):
-    def __init__(self, handler: Callable[[], Awaitable[None]]):
-        super().__init__()
-        self.handler = handler
+    connect_timeout = get_setting(entry, CONF_CONNECT_TIMEOUT)
+    if get_setting(entry, CONF_BACKGROUND_CONNECT):
+        data.start_controllers_in_background(hass, connect_timeout)
+    else:
+        await data.start_controllers(hass, connect_timeout)
 
-    async def update(self, observable: AsyncObservable):
-        await self.handler()
+    return data
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    nd: NiceData = hass.data[DOMAIN][entry.entry_id]
+    if nd.options_debouncer is not None:
+        await nd.options_debouncer.async_call()
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Nice from a config entry."""
-    _LOGGER.debug("nice async_setup_entry")
+async def _async_apply_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply the difference between the applied config and the entry config"""
+    nd: NiceData | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if nd is None:
+        return
 
-    nd = await make_nice_data(hass, entry)
+    old_controllers = nd.applied_data[CONF_CONTROLLERS]
+    new_controllers = entry.data[CONF_CONTROLLERS]
+    old_covers = nd.applied_data[CONF_COVERS]
+    new_covers = entry.data[CONF_COVERS]
+    old_ciw_helpers = nd.applied_options.get(CONF_CIW_HELPERS, {})
+    new_ciw_helpers = entry.options.get(CONF_CIW_HELPERS, {})
+    device_registry = dr.async_get(hass)
+    connect_timeout = get_setting(entry, CONF_CONNECT_TIMEOUT)
 
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = nd
+    removed_cover_ids = [
+        id for id, config in old_covers.items() if new_covers.get(id) != config
+    ]
 
-    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    # A CIW Helper is rebuilt if either of its Covers is
+    for ciw_id, ciw_config in old_ciw_helpers.items():
+        if new_ciw_helpers.get(ciw_id) != ciw_config or any(
+            ciw_config[key] in removed_cover_ids
+            for key in (CONF_SCREEN_COVER, CONF_MASK_COVER)
+        ):
+            _LOGGER.debug(f"Removing CIW Helper {ciw_id}")
+            nd.remove_ciw_helper(ciw_id)
+            async_dispatcher_send(hass, SIGNAL_REMOVE_CIW_HELPER.format(ciw_id))
+        if ciw_id not in new_ciw_helpers:
+            _async_remove_from_registries(hass, entry, ciw_id)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    for cover_id in removed_cover_ids:
+        _LOGGER.debug(f"Removing Cover {cover_id}")
+        async_dispatcher_send(hass, SIGNAL_REMOVE_COVER.format(cover_id))
+        await nd.remove_cover(cover_id)
+        if cover_id not in new_covers:
+            _async_remove_from_registries(hass, entry, cover_id)
+
+    for controller_id, controller_config in old_controllers.items():
+        if controller_id not in new_controllers:
+            _LOGGER.debug(f"Removing Controller {controller_id}")
+            async_dispatcher_send(hass, SIGNAL_REMOVE_CONTROLLER.format(controller_id))
+            await nd.remove_controller(controller_id)
+            _async_remove_from_registries(hass, entry, controller_id)
+        elif (
+            new_controllers[controller_id][CONF_SERIAL_PORT]
+            != controller_config[CONF_SERIAL_PORT]
+        ):
+            _LOGGER.debug(f"Changing serial port of Controller {controller_id}")
+            await nd.controllers[controller_id].change_serial_port(
+                hass,
+                new_controllers[controller_id][CONF_SERIAL_PORT],
+                connect_timeout,
+            )
+
+    added_controller_ids = [
+        id for id in new_controllers.keys() if id not in old_controllers
+    ]
+    for controller_id in added_controller_ids:
+        _LOGGER.debug(f"Adding Controller {controller_id}")
+        nd.add_controller(controller_id, new_controllers[controller_id])
+        _async_add_controller_device(
+            device_registry, entry, controller_id, new_controllers[controller_id]
+        )
+        nd.controllers[controller_id].connect_in_background(hass, connect_timeout)
+    if added_controller_ids:
+        async_dispatcher_send(
+            hass, SIGNAL_ADD_CONTROLLERS.format(entry.entry_id), added_controller_ids
+        )
+
+    added_cover_ids = [id for id in new_covers.keys() if id not in nd.nice_covers]
+    for cover_id in added_cover_ids:
+        _LOGGER.debug(f"Adding Cover {cover_id}")
+        nd.add_cover(cover_id, new_covers[cover_id])
+        _async_add_cover_device(device_registry, entry, cover_id, new_covers[cover_id])
+        nice_cover = nd.nice_covers[cover_id]
+        await nice_cover.controller.connect_cover(nice_cover.tt_addr)
+    if added_cover_ids:
+        async_dispatcher_send(
+            hass, SIGNAL_ADD_COVERS.format(entry.entry_id), added_cover_ids
+        )
+
+    added_ciw_ids = [id for id in new_ciw_helpers.keys() if id not in nd.ciw_helpers]
+    for ciw_id in added_ciw_ids:
+        _LOGGER.debug(f"Adding CIW Helper {ciw_id}")
+        nd.add_ciw_helper(ciw_id, new_ciw_helpers[ciw_id])
+    if added_ciw_ids:
+        async_dispatcher_send(
+            hass, SIGNAL_ADD_CIW_HELPERS.format(entry.entry_id), added_ciw_ids
+        )
+
+    nd.set_pos_command_window(get_setting(entry, CONF_POS_COMMAND_WINDOW))
+    nd.set_moving_write_rate(get_setting(entry, CONF_MOVING_WRITE_RATE))
+    nd.set_sensor_deadband(get_setting(entry, CONF_SENSOR_DEADBAND))
+    nd.set_optimistic(get_setting(entry, CONF_OPTIMISTIC))
+    nd.set_poll_budget(get_setting(entry, CONF_POLL_BUDGET))
+    nd.set_coordinated_moves(get_setting(entry, CONF_COORDINATED_MOVES))
+
+    _async_register_preset_service(hass, entry, nd)
+
+    nd.applied_data = deepcopy(dict(entry.data))
+    nd.applied_options = deepcopy(dict(entry.options))
+
+
+SERVICE_MOVE_COVERS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_COVERS): vol.All(
+            cv.ensure_list,
+            [
+                vol.All(
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+                            vol.Exclusive(ATTR_DROP_PERCENT, "drop"): vol.All(
+                                vol.Coerce(float), vol.Range(min=0.0, max=100.0)
+                            ),
+                            vol.Exclusive(CONF_DROP, "drop"): vol.All(
+                                vol.Coerce(float), vol.Range(min=0.0)
+                            ),
+                        }
+                    ),
+                    cv.has_at_least_one_key(ATTR_DROP_PERCENT, CONF_DROP),
+                )
+            ],
+        )
+    }
+)
+
+
+SERVICE_MOVE_AND_WAIT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_DROP_PERCENT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0, max=100.0)
+        ),
+        vol.Optional(ATTR_TOLERANCE, default=0.5): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0, max=10.0)
+        ),
+        vol.Optional(ATTR_TIMEOUT, default=120.0): vol.All(
+            vol.Coerce(float), vol.Range(min=1.0, max=600.0)
+        ),
+    }
+)
+
+SERVICE_CIW_SCHEMA = {
+    vol.Required(CONF_NAME): cv.string,
+    vol.Optional(ATTR_BASELINE, default=BASELINE_BOTTOM): vol.In(
+        [BASELINE_BOTTOM, BASELINE_MIDDLE, BASELINE_TOP]
+    ),
+}
+
+SERVICE_SET_ASPECT_RATIO_SCHEMA = vol.Schema(
+    {
+        **SERVICE_CIW_SCHEMA,
+        vol.Required(ATTR_ASPECT_RATIO): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_ASPECT_RATIO, max=MAX_ASPECT_RATIO)
+        ),
+    }
+)
+
+SERVICE_SET_IMAGE_HEIGHT_SCHEMA = vol.Schema(
+    {
+        **SERVICE_CIW_SCHEMA,
+        vol.Required(ATTR_IMAGE_HEIGHT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0, min_included=False)
+        ),
+    }
+)
+
+
+@callback
+def async_get_ciw_data(hass: HomeAssistant, name: str) -> NiceCIWData:
+    """Look up a CIW Helper by name"""
+    for nd in hass.data[DOMAIN].values():
+        for ciw_data in nd.ciw_helpers.values():
+            if ciw_data.name == name:
+                return ciw_data
+    raise HomeAssistantError(f"{name} is not a CIW Helper")
+
+
+@callback
+def async_get_nice_cover(hass: HomeAssistant, entity_id: str) -> NiceCoverData:
+    """Look up the NiceCoverData for a Nice cover entity"""
+    entity_entry = er.async_get(hass).async_get(entity_id)
+    if entity_entry is not None and entity_entry.platform == DOMAIN:
+        nd: NiceData | None = hass.data[DOMAIN].get(entity_entry.config_entry_id)
+        if nd is not None:
+            for cover_id, nice_cover in nd.nice_covers.items():
+                if slugify(cover_id) == entity_entry.unique_id:
+                    return nice_cover
+    raise HomeAssistantError(f"{entity_id} is not a Nice Cover")
+
+
+@callback
+def _async_register_preset_service(
+    hass: HomeAssistant, entry: ConfigEntry, nd: NiceData
+) -> None:
+    """(Re-)register the apply_preset service for the current set of presets"""
 
     async def apply_preset(call: ServiceCall) -> None:
         """Service call to apply a preset."""
-        for preset in entry.options[CONF_PRESETS].values():
-            if preset[CONF_NAME] == call.data.get(CONF_NAME):
-                for item in preset[CONF_DROPS]:
-                    tt6_cover: TT6Cover = nd.nice_covers[item[CONF_COVER]].tt6_cover
-                    await tt6_cover.send_pos_command(
-                        round(
-                            1000.0 * (1.0 - item[CONF_DROP] / tt6_cover.cover.max_drop)
-                        )
-                    )
+        await async_send_pos_commands(nd.presets[call.data[CONF_NAME]])
 
-    if CONF_PRESETS in entry.options:
-        names = [config[CONF_NAME] for config in entry.options[CONF_PRESETS].values()]
+    nd.compile_presets(entry.options.get(CONF_PRESETS, {}))
+    names = list(nd.presets.keys())
+    if names:
         SERVICE_APPLY_PRESET_SCHEMA = vol.Schema(
             {vol.Required(CONF_NAME): vol.In(names)}
         )
@@ -287,13 +1883,124 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             apply_preset,
             schema=SERVICE_APPLY_PRESET_SCHEMA,
         )
+    elif hass.services.has_service(DOMAIN, SERVICE_APPLY_PRESET):
+        hass.services.async_remove(DOMAIN, SERVICE_APPLY_PRESET)
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Nice from a config entry."""
+    _LOGGER.debug("nice async_setup_entry")
+
+    nd = await make_nice_data(hass, entry)
+
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][entry.entry_id] = nd
+
+    # Rapid consecutive options changes are applied in one go
+    nd.options_debouncer = Debouncer(
+        hass,
+        _LOGGER,
+        cooldown=OPTIONS_UPDATE_COOLDOWN,
+        immediate=False,
+        function=partial(_async_apply_options, hass, entry),
+    )
+    entry.async_on_unload(nd.options_debouncer.async_cancel)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    _async_register_preset_service(hass, entry, nd)
 
     async def reconnect(call: ServiceCall) -> None:
-        for c in nd.controllers.values():
-            await c.reconnect()
+        """Service call to reconnect the controllers of every entry"""
+        await asyncio.gather(
+            *(
+                controller.reconnect()
+                for loaded_nd in hass.data[DOMAIN].values()
+                for controller in loaded_nd.controllers.values()
+            )
+        )
 
     hass.services.async_register(DOMAIN, SERVICE_RECONNECT, reconnect)
 
+    async def move_covers(call: ServiceCall) -> None:
+        """Service call to move many covers, possibly of different entries"""
+        targets = []
+        for item in call.data[ATTR_COVERS]:
+            nice_cover = async_get_nice_cover(hass, item[ATTR_ENTITY_ID])
+            if ATTR_DROP_PERCENT in item:
+                pos = round(item[ATTR_DROP_PERCENT] * 10.0)  # pos of 1000 is fully up
+            elif item[CONF_DROP] <= nice_cover.cover.max_drop:
+                pos = pos_from_drop(item[CONF_DROP], nice_cover.cover.max_drop)
+            else:
+                raise HomeAssistantError(
+                    f"Drop {item[CONF_DROP]} is more than the maximum drop "
+                    f"of {nice_cover.cover.max_drop} for {item[ATTR_ENTITY_ID]}"
+                )
+            targets.append((nice_cover, pos))
+        await async_send_pos_commands(group_by_controller(targets))
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_MOVE_COVERS, move_covers, schema=SERVICE_MOVE_COVERS_SCHEMA
+    )
+
+    async def move_and_wait(call: ServiceCall) -> ServiceResponse:
+        """Service call to move a cover and wait for it to arrive"""
+        entity_id = call.data[ATTR_ENTITY_ID]
+        nice_cover = async_get_nice_cover(hass, entity_id)
+        pos = round(call.data[ATTR_DROP_PERCENT] * 10.0)  # pos of 1000 is fully up
+        waiter = ArrivalWaiter(nice_cover, pos, round(call.data[ATTR_TOLERANCE] * 10.0))
+        start = time.monotonic()
+        arrived = await waiter.wait(
+            nice_cover.send_pos_command(pos), call.data[ATTR_TIMEOUT]
+        )
+        return {
+            ATTR_ENTITY_ID: entity_id,
+            ATTR_DROP_PERCENT: nice_cover.cover.pos / 10.0,
+            ATTR_ELAPSED: round(time.monotonic() - start, 3),
+            ATTR_TIMED_OUT: not arrived,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MOVE_AND_WAIT,
+        move_and_wait,
+        schema=SERVICE_MOVE_AND_WAIT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def set_aspect_ratio(call: ServiceCall) -> None:
+        """Service call to show an image of an aspect ratio on a CIW screen"""
+        ciw_data = async_get_ciw_data(hass, call.data[CONF_NAME])
+        await ciw_data.move_to(
+            *ciw_data.geometry.solve_aspect_ratio(
+                call.data[ATTR_ASPECT_RATIO], call.data[ATTR_BASELINE]
+            )
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_ASPECT_RATIO,
+        set_aspect_ratio,
+        schema=SERVICE_SET_ASPECT_RATIO_SCHEMA,
+    )
+
+    async def set_image_height(call: ServiceCall) -> None:
+        """Service call to show an image of a height on a CIW screen"""
+        ciw_data = async_get_ciw_data(hass, call.data[CONF_NAME])
+        await ciw_data.move_to(
+            *ciw_data.geometry.solve(
+                call.data[ATTR_IMAGE_HEIGHT], call.data[ATTR_BASELINE]
+            )
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_IMAGE_HEIGHT,
+        set_image_height,
+        schema=SERVICE_SET_IMAGE_HEIGHT_SCHEMA,
+    )
+
     return True
 
 
@@ -307,5 +2014,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         api = hass.data[DOMAIN].pop(entry.entry_id)
         await api.close()
+        if not hass.data[DOMAIN]:
+            for service in DOMAIN_SERVICES:
+                if hass.services.has_service(DOMAIN, service):
+                    hass.services.async_remove(DOMAIN, service)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the learnt travel rates along with the config entry."""
+    await Store(
+        hass, TRAVEL_STORAGE_VERSION, TRAVEL_STORAGE_KEY.format(entry.entry_id)
+    ).async_remove()
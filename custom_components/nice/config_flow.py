@@ -21,9 +21,15 @@ from serial import SerialException
 
 from .const import (
     ACTION_ADD_CIW,
+    ACTION_ADD_CONTROLLER,
+    ACTION_ADD_COVER,
     ACTION_ADD_PRESET,
+    ACTION_CHANGE_SERIAL_PORT,
     ACTION_DEL_CIW,
+    ACTION_DEL_CONTROLLER,
+    ACTION_DEL_COVER,
     ACTION_DEL_PRESET,
+    ACTION_SETTINGS,
     CHOICE_ASPECT_RATIO_2_35_1,
     CHOICE_ASPECT_RATIO_4_3,
     CHOICE_ASPECT_RATIO_16_9,
@@ -31,9 +37,12 @@ from .const import (
     CONF_ACTION,
     CONF_ADD_ANOTHER,
     CONF_ADDRESS,
+    CONF_BACKGROUND_CONNECT,
     CONF_CIW_HELPERS,
+    CONF_CONNECT_TIMEOUT,
     CONF_CONTROLLER,
     CONF_CONTROLLERS,
+    CONF_COORDINATED_MOVES,
     CONF_COVER,
     CONF_COVERS,
     CONF_DROP,
@@ -46,12 +55,19 @@ from .const import (
     CONF_IMAGE_BORDER_BELOW,
     CONF_IMAGE_HEIGHT,
     CONF_MASK_COVER,
+    CONF_MOVING_WRITE_RATE,
     CONF_NODE,
+    CONF_OPTIMISTIC,
+    CONF_POLL_BUDGET,
+    CONF_POS_COMMAND_WINDOW,
     CONF_PRESETS,
     CONF_SCREEN_COVER,
     CONF_SELECT,
+    CONF_SENSOR_DEADBAND,
     CONF_SERIAL_PORT,
+    CONF_SETTINGS,
     CONF_TITLE,
+    DEFAULT_SETTINGS,
     DOMAIN,
 )
 
@@ -79,6 +95,82 @@ def make_id():
     return slugify(str(uuid4()))
 
 
+def make_cover_schema(valid_controllers: dict[str, str], next_num: int) -> vol.Schema:
+    return vol.Schema(
+        {
+            vol.Required(CONF_NAME, default=f"Cover {next_num}"): str,  # type: ignore
+            vol.Required(CONF_CONTROLLER): vol.In(valid_controllers),
+            vol.Required(CONF_ADDRESS): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(CONF_NODE, default=4): vol.All(  # type: ignore
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+            vol.Required(CONF_DROP): vol.All(
+                vol.Coerce(float), vol.Range(min=0, min_included=False)
+            ),
+            vol.Optional(CONF_HAS_REVERSE_SEMANTICS, default=False): bool,  # type: ignore
+            vol.Optional(CONF_HAS_IMAGE_AREA, default=False): bool,  # type: ignore
+        }
+    )
+
+
+def cover_config_from_input(user_input: dict[str, Any]) -> dict[str, Any]:
+    return {
+        CONF_NAME: user_input[CONF_NAME],
+        CONF_CONTROLLER: user_input[CONF_CONTROLLER],
+        CONF_ADDRESS: user_input[CONF_ADDRESS],
+        CONF_NODE: user_input[CONF_NODE],
+        CONF_DROP: user_input[CONF_DROP],
+        CONF_IMAGE_AREA: None,
+        CONF_HAS_REVERSE_SEMANTICS: user_input[CONF_HAS_REVERSE_SEMANTICS],
+    }
+
+
+def make_image_area_schema() -> vol.Schema:
+    aspect_ratio_choices = {
+        CHOICE_ASPECT_RATIO_16_9: "16:9",
+        CHOICE_ASPECT_RATIO_2_35_1: "2.35:1",
+        CHOICE_ASPECT_RATIO_4_3: "4:3",
+        CHOICE_ASPECT_RATIO_OTHER: "Other",
+    }
+
+    return vol.Schema(
+        {
+            vol.Required(CONF_IMAGE_BORDER_BELOW): vol.All(
+                vol.Coerce(float), vol.Range(min=0, min_included=False)
+            ),
+            vol.Required(CONF_IMAGE_HEIGHT): vol.All(
+                vol.Coerce(float), vol.Range(min=0, min_included=False)
+            ),
+            vol.Required(CONF_IMAGE_ASPECT_RATIO_CHOICE): vol.In(aspect_ratio_choices),
+            vol.Optional(CONF_IMAGE_ASPECT_RATIO_OTHER): vol.All(
+                vol.Coerce(float),
+                vol.Range(min=MIN_ASPECT_RATIO, max=MAX_ASPECT_RATIO),
+            ),
+        }
+    )
+
+
+def validate_image_area(user_input: dict[str, Any], max_drop: float) -> dict[str, str]:
+    errors = {}
+    if user_input[CONF_IMAGE_BORDER_BELOW] + user_input[CONF_IMAGE_HEIGHT] > max_drop:
+        errors["base"] = "image_area_too_tall"
+    elif (
+        user_input[CONF_IMAGE_ASPECT_RATIO_CHOICE] == "aspect_ratio_other"
+        and user_input.get(CONF_IMAGE_ASPECT_RATIO_OTHER) is None
+    ):
+        errors[CONF_IMAGE_ASPECT_RATIO_OTHER] = "aspect_ratio_other_required"
+    return errors
+
+
+def image_area_config_from_input(user_input: dict[str, Any]) -> dict[str, Any]:
+    return {
+        CONF_IMAGE_BORDER_BELOW: user_input[CONF_IMAGE_BORDER_BELOW],
+        CONF_IMAGE_HEIGHT: user_input[CONF_IMAGE_HEIGHT],
+        CONF_IMAGE_ASPECT_RATIO_CHOICE: user_input[CONF_IMAGE_ASPECT_RATIO_CHOICE],
+        CONF_IMAGE_ASPECT_RATIO_OTHER: user_input.get(CONF_IMAGE_ASPECT_RATIO_OTHER),
+    }
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Nice."""
 
@@ -169,15 +261,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             cover_id = make_id()
             # TODO: Send a pos request to validate address, node
-            self.data[CONF_COVERS][cover_id] = {
-                CONF_NAME: user_input[CONF_NAME],
-                CONF_CONTROLLER: user_input[CONF_CONTROLLER],
-                CONF_ADDRESS: user_input[CONF_ADDRESS],
-                CONF_NODE: user_input[CONF_NODE],
-                CONF_DROP: user_input[CONF_DROP],
-                CONF_IMAGE_AREA: None,
-                CONF_HAS_REVERSE_SEMANTICS: user_input[CONF_HAS_REVERSE_SEMANTICS],
-            }
+            self.data[CONF_COVERS][cover_id] = cover_config_from_input(user_input)
             if user_input[CONF_HAS_IMAGE_AREA]:
                 self.tmp = cover_id
                 return await self.async_step_image_area()
@@ -189,21 +273,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             id: config[CONF_NAME] for id, config in self.data[CONF_CONTROLLERS].items()
         }
 
-        data_schema = vol.Schema(
-            {
-                vol.Required(CONF_NAME, default=f"Cover {next_num}"): str,  # type: ignore
-                vol.Required(CONF_CONTROLLER): vol.In(valid_controllers),
-                vol.Required(CONF_ADDRESS): vol.All(vol.Coerce(int), vol.Range(min=0)),
-                vol.Required(CONF_NODE, default=4): vol.All(  # type: ignore
-                    vol.Coerce(int), vol.Range(min=0)
-                ),
-                vol.Required(CONF_DROP): vol.All(
-                    vol.Coerce(float), vol.Range(min=0, min_included=False)
-                ),
-                vol.Optional(CONF_HAS_REVERSE_SEMANTICS, default=False): bool,  # type: ignore
-                vol.Optional(CONF_HAS_IMAGE_AREA, default=False): bool,  # type: ignore
-            }
-        )
+        data_schema = make_cover_schema(valid_controllers, next_num)
 
         return self.async_show_form(
             step_id="cover",
@@ -219,53 +289,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
-            if (
-                user_input[CONF_IMAGE_BORDER_BELOW] + user_input[CONF_IMAGE_HEIGHT]
-                > cover_config[CONF_DROP]
-            ):
-                errors["base"] = "image_area_too_tall"
-            elif (
-                user_input[CONF_IMAGE_ASPECT_RATIO_CHOICE] == "aspect_ratio_other"
-                and user_input.get(CONF_IMAGE_ASPECT_RATIO_OTHER) is None
-            ):
-                errors[CONF_IMAGE_ASPECT_RATIO_OTHER] = "aspect_ratio_other_required"
-            else:
-                cover_config[CONF_IMAGE_AREA] = {
-                    CONF_IMAGE_BORDER_BELOW: user_input[CONF_IMAGE_BORDER_BELOW],
-                    CONF_IMAGE_HEIGHT: user_input[CONF_IMAGE_HEIGHT],
-                    CONF_IMAGE_ASPECT_RATIO_CHOICE: user_input[
-                        CONF_IMAGE_ASPECT_RATIO_CHOICE
-                    ],
-                    CONF_IMAGE_ASPECT_RATIO_OTHER: user_input.get(
-                        CONF_IMAGE_ASPECT_RATIO_OTHER
-                    ),
-                }
+            errors = validate_image_area(user_input, cover_config[CONF_DROP])
+            if not errors:
+                cover_config[CONF_IMAGE_AREA] = image_area_config_from_input(user_input)
                 return await self.async_step_finish_cover()
 
-        aspect_ratio_choices = {
-            CHOICE_ASPECT_RATIO_16_9: "16:9",
-            CHOICE_ASPECT_RATIO_2_35_1: "2.35:1",
-            CHOICE_ASPECT_RATIO_4_3: "4:3",
-            CHOICE_ASPECT_RATIO_OTHER: "Other",
-        }
-
-        data_schema = vol.Schema(
-            {
-                vol.Required(CONF_IMAGE_BORDER_BELOW): vol.All(
-                    vol.Coerce(float), vol.Range(min=0, min_included=False)
-                ),
-                vol.Required(CONF_IMAGE_HEIGHT): vol.All(
-                    vol.Coerce(float), vol.Range(min=0, min_included=False)
-                ),
-                vol.Required(CONF_IMAGE_ASPECT_RATIO_CHOICE): vol.In(
-                    aspect_ratio_choices
-                ),
-                vol.Optional(CONF_IMAGE_ASPECT_RATIO_OTHER): vol.All(
-                    vol.Coerce(float),
-                    vol.Range(min=MIN_ASPECT_RATIO, max=MAX_ASPECT_RATIO),
-                ),
-            }
-        )
+        data_schema = make_image_area_schema()
 
         return self.async_show_form(
             step_id="image_area",
@@ -305,19 +334,46 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             ),
             CONF_PRESETS: deepcopy(self.config_entry.options.get(CONF_PRESETS, {})),
         }
+        if CONF_SETTINGS in self.config_entry.options:
+            self.data[CONF_SETTINGS] = deepcopy(
+                self.config_entry.options[CONF_SETTINGS]
+            )
+        # Controllers and Covers live in the entry data rather than the options
+        self.config = deepcopy(dict(self.config_entry.data))
         self.valid_screen_covers = {
             id: config[CONF_NAME]
-            for id, config in self.config_entry.data[CONF_COVERS].items()
+            for id, config in self.config[CONF_COVERS].items()
             if config[CONF_IMAGE_AREA] is not None
         }
         self.valid_mask_covers = {
             id: config[CONF_NAME]
-            for id, config in self.config_entry.data[CONF_COVERS].items()
+            for id, config in self.config[CONF_COVERS].items()
             if config[CONF_IMAGE_AREA] is None
         }
+        self.tmp_cover_id = None
         self.tmp_preset_id = None
         self.tmp_drops_to_define = []
 
+    def _controller_names(self) -> dict[str, str]:
+        return {
+            id: config[CONF_NAME]
+            for id, config in self.config[CONF_CONTROLLERS].items()
+        }
+
+    def _unused_controller_names(self) -> dict[str, str]:
+        used = {config[CONF_CONTROLLER] for config in self.config[CONF_COVERS].values()}
+        return {
+            id: name for id, name in self._controller_names().items() if id not in used
+        }
+
+    def _async_save(self) -> FlowResult:
+        """Save the Controllers and Covers to the entry data and finish"""
+        if self.config != self.config_entry.data:
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data=self.config
+            )
+        return self.async_create_entry(title="", data=self.data)
+
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -332,7 +388,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         errors = {}
 
         if user_input is not None:
-            if user_input[CONF_ACTION] == ACTION_ADD_CIW:
+            if user_input[CONF_ACTION] == ACTION_ADD_CONTROLLER:
+                return await self.async_step_add_controller()
+            elif user_input[CONF_ACTION] == ACTION_CHANGE_SERIAL_PORT:
+                return await self.async_step_change_serial_port()
+            elif user_input[CONF_ACTION] == ACTION_DEL_CONTROLLER:
+                return await self.async_step_del_controller()
+            elif user_input[CONF_ACTION] == ACTION_ADD_COVER:
+                return await self.async_step_add_cover()
+            elif user_input[CONF_ACTION] == ACTION_DEL_COVER:
+                return await self.async_step_del_cover()
+            elif user_input[CONF_ACTION] == ACTION_ADD_CIW:
                 return await self.async_step_add_ciw_helper()
             elif user_input[CONF_ACTION] == ACTION_DEL_CIW:
                 return await self.async_step_del_ciw_helper()
@@ -340,10 +406,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 return await self.async_step_add_preset()
             elif user_input[CONF_ACTION] == ACTION_DEL_PRESET:
                 return await self.async_step_del_preset()
+            elif user_input[CONF_ACTION] == ACTION_SETTINGS:
+                return await self.async_step_settings()
             else:  # pragma: no cover
                 return self.async_abort(reason="not_implemented")
 
-        actions = []
+        actions = [ACTION_ADD_CONTROLLER]
+        if len(self.config[CONF_CONTROLLERS]) > 0:
+            actions.append(ACTION_CHANGE_SERIAL_PORT)
+        if len(self._unused_controller_names()) > 0:
+            actions.append(ACTION_DEL_CONTROLLER)
+        if len(self.config[CONF_CONTROLLERS]) > 0:
+            actions.append(ACTION_ADD_COVER)
+        if len(self.config[CONF_COVERS]) > 0:
+            actions.append(ACTION_DEL_COVER)
         if len(self.valid_screen_covers) > 0 and len(self.valid_mask_covers) > 0:
             actions.append(ACTION_ADD_CIW)
         if len(self.data[CONF_CIW_HELPERS]) > 0:
@@ -351,6 +427,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         actions.append(ACTION_ADD_PRESET)
         if len(self.data[CONF_PRESETS]) > 0:
             actions.append(ACTION_DEL_PRESET)
+        actions.append(ACTION_SETTINGS)
 
         data_schema = vol.Schema({vol.Required(CONF_ACTION): vol.In(actions)})
 
@@ -360,6 +437,174 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_add_controller(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            if not await validate_serial_port(user_input[CONF_SERIAL_PORT]):
+                errors["base"] = "cannot_connect"
+            else:
+                self.config[CONF_CONTROLLERS][make_id()] = {
+                    CONF_NAME: user_input[CONF_NAME],
+                    CONF_SERIAL_PORT: user_input[CONF_SERIAL_PORT],
+                }
+                return self._async_save()
+
+        next_num = len(self.config[CONF_CONTROLLERS]) + 1
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME, default=f"Controller {next_num}"): str,  # type: ignore
+                vol.Required(CONF_SERIAL_PORT): str,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="add_controller",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={"sequence_number": str(next_num)},
+        )
+
+    async def async_step_change_serial_port(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            if not await validate_serial_port(user_input[CONF_SERIAL_PORT]):
+                errors["base"] = "cannot_connect"
+            else:
+                controller_config = self.config[CONF_CONTROLLERS][
+                    user_input[CONF_CONTROLLER]
+                ]
+                controller_config[CONF_SERIAL_PORT] = user_input[CONF_SERIAL_PORT]
+                return self._async_save()
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_CONTROLLER): vol.In(self._controller_names()),
+                vol.Required(CONF_SERIAL_PORT): str,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="change_serial_port",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_del_controller(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            for id in user_input[CONF_SELECT]:
+                del self.config[CONF_CONTROLLERS][id]
+            return self._async_save()
+
+        # A Controller can only be deleted once all of its Covers have been
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_SELECT): cv.multi_select(
+                    self._unused_controller_names()
+                )
+            }
+        )
+
+        return self.async_show_form(
+            step_id="del_controller",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_add_cover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            self.tmp_cover_id = make_id()
+            self.config[CONF_COVERS][self.tmp_cover_id] = cover_config_from_input(
+                user_input
+            )
+            if user_input[CONF_HAS_IMAGE_AREA]:
+                return await self.async_step_cover_image_area()
+            else:
+                return self._async_save()
+
+        next_num = len(self.config[CONF_COVERS]) + 1
+
+        data_schema = make_cover_schema(self._controller_names(), next_num)
+
+        return self.async_show_form(
+            step_id="add_cover",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={"sequence_number": str(next_num)},
+        )
+
+    async def async_step_cover_image_area(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        cover_config = self.config[CONF_COVERS][self.tmp_cover_id]
+        errors = {}
+
+        if user_input is not None:
+            errors = validate_image_area(user_input, cover_config[CONF_DROP])
+            if not errors:
+                cover_config[CONF_IMAGE_AREA] = image_area_config_from_input(user_input)
+                return self._async_save()
+
+        data_schema = make_image_area_schema()
+
+        return self.async_show_form(
+            step_id="cover_image_area",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={"cover_name": cover_config[CONF_NAME]},
+        )
+
+    async def async_step_del_cover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            for id in user_input[CONF_SELECT]:
+                del self.config[CONF_COVERS][id]
+                # Anything that refers to the Cover goes with it
+                for ciw_id, ciw_config in list(self.data[CONF_CIW_HELPERS].items()):
+                    if id in (
+                        ciw_config[CONF_SCREEN_COVER],
+                        ciw_config[CONF_MASK_COVER],
+                    ):
+                        del self.data[CONF_CIW_HELPERS][ciw_id]
+                for preset_id, preset_config in list(self.data[CONF_PRESETS].items()):
+                    preset_config[CONF_DROPS] = [
+                        item
+                        for item in preset_config[CONF_DROPS]
+                        if item[CONF_COVER] != id
+                    ]
+                    if len(preset_config[CONF_DROPS]) == 0:
+                        del self.data[CONF_PRESETS][preset_id]
+            return self._async_save()
+
+        covers = {
+            id: config[CONF_NAME] for id, config in self.config[CONF_COVERS].items()
+        }
+
+        data_schema = vol.Schema({vol.Required(CONF_SELECT): cv.multi_select(covers)})
+
+        return self.async_show_form(
+            step_id="del_cover",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
     async def async_step_add_ciw_helper(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -442,8 +687,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         next_num = len(self.data[CONF_PRESETS]) + 1
         covers = {
-            id: config[CONF_NAME]
-            for id, config in self.config_entry.data[CONF_COVERS].items()
+            id: config[CONF_NAME] for id, config in self.config[CONF_COVERS].items()
         }
 
         data_schema = vol.Schema(
@@ -469,7 +713,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         preset_config = self.data[CONF_PRESETS][self.tmp_preset_id]
         cover_id = self.tmp_drops_to_define[0]
-        cover_config = self.config_entry.data[CONF_COVERS][cover_id]
+        cover_config = self.config[CONF_COVERS][cover_id]
 
         if user_input is not None:
             preset_config[CONF_DROPS].append(
@@ -527,3 +771,49 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             data_schema=data_schema,
             errors=errors,
         )
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        errors = {}
+
+        if user_input is not None:
+            self.data[CONF_SETTINGS] = {
+                key: user_input[key] for key in DEFAULT_SETTINGS.keys()
+            }
+            return self.async_create_entry(title="", data=self.data)
+
+        settings = {**DEFAULT_SETTINGS, **self.data.get(CONF_SETTINGS, {})}
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_CONNECT_TIMEOUT, default=settings[CONF_CONNECT_TIMEOUT]
+                ): vol.All(vol.Coerce(float), vol.Range(min=1.0, max=300.0)),
+                vol.Required(
+                    CONF_BACKGROUND_CONNECT, default=settings[CONF_BACKGROUND_CONNECT]
+                ): bool,
+                vol.Required(
+                    CONF_POS_COMMAND_WINDOW, default=settings[CONF_POS_COMMAND_WINDOW]
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=5.0)),
+                vol.Required(
+                    CONF_MOVING_WRITE_RATE, default=settings[CONF_MOVING_WRITE_RATE]
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=20.0)),
+                vol.Required(
+                    CONF_SENSOR_DEADBAND, default=settings[CONF_SENSOR_DEADBAND]
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=10.0)),
+                vol.Required(CONF_OPTIMISTIC, default=settings[CONF_OPTIMISTIC]): bool,
+                vol.Required(
+                    CONF_POLL_BUDGET, default=settings[CONF_POLL_BUDGET]
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=10.0)),
+                vol.Required(
+                    CONF_COORDINATED_MOVES, default=settings[CONF_COORDINATED_MOVES]
+                ): bool,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=data_schema,
+            errors=errors,
+        )
@@ -5,6 +5,7 @@ CONF_COVERS = "covers"
 CONF_IMAGE_AREA = "image_area"
 CONF_CIW_HELPERS = "ciw_helpers"
 CONF_PRESETS = "presets"
+CONF_SETTINGS = "settings"
 
 CONF_TITLE = "title"
 CONF_SERIAL_PORT = "serial_port"
@@ -25,6 +26,62 @@ CONF_SELECT = "select"
 CONF_COVER = "cover"
 CONF_DROPS = "drops"
 CONF_HAS_REVERSE_SEMANTICS = "has_reverse_semantics"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_BACKGROUND_CONNECT = "background_connect"
+CONF_POS_COMMAND_WINDOW = "pos_command_window"
+CONF_MOVING_WRITE_RATE = "moving_write_rate"
+CONF_SENSOR_DEADBAND = "sensor_deadband"
+CONF_OPTIMISTIC = "optimistic"
+CONF_POLL_BUDGET = "poll_budget"
+CONF_COORDINATED_MOVES = "coordinated_moves"
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_BACKGROUND_CONNECT = False
+DEFAULT_POS_COMMAND_WINDOW = 0.25
+DEFAULT_MOVING_WRITE_RATE = 2.0
+DEFAULT_SENSOR_DEADBAND = 0.0
+DEFAULT_OPTIMISTIC = False
+DEFAULT_POLL_BUDGET = 0.0
+DEFAULT_COORDINATED_MOVES = False
+
+DEFAULT_SETTINGS = {
+    CONF_CONNECT_TIMEOUT: DEFAULT_CONNECT_TIMEOUT,
+    CONF_BACKGROUND_CONNECT: DEFAULT_BACKGROUND_CONNECT,
+    CONF_POS_COMMAND_WINDOW: DEFAULT_POS_COMMAND_WINDOW,
+    CONF_MOVING_WRITE_RATE: DEFAULT_MOVING_WRITE_RATE,
+    CONF_SENSOR_DEADBAND: DEFAULT_SENSOR_DEADBAND,
+    CONF_OPTIMISTIC: DEFAULT_OPTIMISTIC,
+    CONF_POLL_BUDGET: DEFAULT_POLL_BUDGET,
+    CONF_COORDINATED_MOVES: DEFAULT_COORDINATED_MOVES,
+}
+
+ATTR_ASPECT_RATIO = "aspect_ratio"
+ATTR_BASELINE = "baseline"
+ATTR_COVERS = "covers"
+ATTR_DIRECTION = "direction"
+ATTR_DROP_PERCENT = "drop_percent"
+ATTR_DURATION = "duration"
+ATTR_ELAPSED = "elapsed"
+ATTR_END_POSITION = "end_position"
+ATTR_IMAGE_HEIGHT = "image_height"
+ATTR_STALE = "stale"
+ATTR_START_POSITION = "start_position"
+ATTR_TIME_TO_TARGET = "time_to_target"
+ATTR_TIMED_OUT = "timed_out"
+ATTR_TIMEOUT = "timeout"
+ATTR_TOLERANCE = "tolerance"
+
+EVENT_MOTION_STARTED = "nice_motion_started"
+EVENT_MOTION_FINISHED = "nice_motion_finished"
+
+TRAVEL_UP = "up"
+TRAVEL_DOWN = "down"
+TRAVEL_STORAGE_KEY = "nice.{}.travel"
+TRAVEL_STORAGE_VERSION = 1
+
+BASELINE_BOTTOM = "bottom"
+BASELINE_MIDDLE = "middle"
+BASELINE_TOP = "top"
 
 CHOICE_ASPECT_RATIO_16_9 = "aspect_ratio_16_9"
 CHOICE_ASPECT_RATIO_2_35_1 = "aspect_ratio_2_35_1"
@@ -32,12 +89,29 @@ CHOICE_ASPECT_RATIO_4_3 = "aspect_ratio_4_3"
 CHOICE_ASPECT_RATIO_OTHER = "aspect_ratio_other"
 
 SERVICE_APPLY_PRESET = "apply_preset"
+SERVICE_SET_ASPECT_RATIO = "set_aspect_ratio"
+SERVICE_SET_IMAGE_HEIGHT = "set_image_height"
+SERVICE_MOVE_AND_WAIT = "move_and_wait"
+SERVICE_MOVE_COVERS = "move_covers"
 SERVICE_RECONNECT = "reconnect"
 SERVICE_REFRESH_POSITION = "refresh_position"
 SERVICE_SEND_SIMPLE_COMMAND = "send_simple_command"
 SERVICE_SET_DROP_PERCENT = "set_drop_percent"
 
+SIGNAL_ADD_CIW_HELPERS = "nice_add_ciw_helpers_{}"
+SIGNAL_REMOVE_CIW_HELPER = "nice_remove_ciw_helper_{}"
+SIGNAL_ADD_CONTROLLERS = "nice_add_controllers_{}"
+SIGNAL_REMOVE_CONTROLLER = "nice_remove_controller_{}"
+SIGNAL_ADD_COVERS = "nice_add_covers_{}"
+SIGNAL_REMOVE_COVER = "nice_remove_cover_{}"
+
+ACTION_ADD_CONTROLLER = "Add Controller"
+ACTION_CHANGE_SERIAL_PORT = "Change Serial Port"
+ACTION_DEL_CONTROLLER = "Delete Controller(s)"
+ACTION_ADD_COVER = "Add Cover"
+ACTION_DEL_COVER = "Delete Cover(s)"
 ACTION_ADD_CIW = "Add CIW Helper"
 ACTION_DEL_CIW = "Delete CIW Helper(s)"
 ACTION_ADD_PRESET = "Add Preset"
 ACTION_DEL_PRESET = "Delete Preset(s)"
+ACTION_SETTINGS = "Change Settings"
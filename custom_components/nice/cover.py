@@ -1,21 +1,39 @@
+from typing import Awaitable, Callable, Iterable
+
 import voluptuous as vol
 from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
     ATTR_POSITION,
     CoverDeviceClass,
     CoverEntity,
     CoverEntityFeature,
 )
+from homeassistant.const import ATTR_ICON, STATE_CLOSED, STATE_OPEN
+from homeassistant.core import callback
 from homeassistant.helpers import entity_platform
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import slugify
 from nicett6.command_code import simple_command_code_names
-from nicett6.tt6_cover import TT6Cover
 
-from . import EntityUpdater, NiceData
+from . import (
+    EntityUpdater,
+    MotionEventTracker,
+    NiceCoverData,
+    NiceData,
+    StateWriteThrottle,
+)
 from .const import (
+    ATTR_DROP_PERCENT,
+    ATTR_STALE,
+    ATTR_TIME_TO_TARGET,
     DOMAIN,
     SERVICE_REFRESH_POSITION,
     SERVICE_SEND_SIMPLE_COMMAND,
     SERVICE_SET_DROP_PERCENT,
+    SIGNAL_ADD_COVERS,
+    SIGNAL_REMOVE_COVER,
 )
 
 
@@ -23,11 +41,21 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the cover(s)"""
     data: NiceData = hass.data[DOMAIN][config_entry.entry_id]
 
-    entities = [
-        NiceCover(slugify(id), item.tt6_cover, item.has_reverse_semantics)
-        for id, item in data.nice_covers.items()
-    ]
-    async_add_entities(entities)
+    @callback
+    def async_add_covers(cover_ids: Iterable[str]) -> None:
+        async_add_entities(
+            [NiceCover(slugify(id), data.nice_covers[id]) for id in cover_ids]
+        )
+
+    async_add_covers(data.nice_covers.keys())
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADD_COVERS.format(config_entry.entry_id),
+            async_add_covers,
+        )
+    )
 
     platform = entity_platform.async_get_current_platform()
 
@@ -53,23 +81,35 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     )
 
 
-class NiceCover(CoverEntity):
+class NiceCover(CoverEntity, RestoreEntity):
     """Representation of a Cover driven by a Nice Tubular Motor"""
 
-    def __init__(
-        self, cover_id: str, tt6_cover: TT6Cover, has_reverse_semantics: bool
-    ) -> None:
+    # Changes on every position message so is not worth recording
+    _unrecorded_attributes = frozenset({ATTR_DROP_PERCENT, ATTR_TIME_TO_TARGET})
+
+    # Seconds to wait for the Cover to report before an optimistic state is
+    # rolled back
+    OPTIMISTIC_TIMEOUT = 5.0
+
+    def __init__(self, cover_id: str, data: NiceCoverData) -> None:
         """Create HA entity representing a cover"""
         self._attr_unique_id = cover_id
-        self._tt6_cover: TT6Cover = tt6_cover
-        self._has_reverse_semantics = has_reverse_semantics
+        self._cover_id = cover_id
+        self._data: NiceCoverData = data
+        self._cover = data.cover
+        self._has_reverse_semantics = data.has_reverse_semantics
         self._attr_has_entity_name = True
         self._attr_name = None
         self._attr_is_closed = None  # Not initialised by CoverEntity
         self._attr_should_poll = False
         self._attr_device_class = CoverDeviceClass.SHADE
         self._attr_device_info = {"identifiers": {(DOMAIN, cover_id)}}
-        self._updater = EntityUpdater(self.handle_update)
+        self._controller_updater = EntityUpdater(self.handle_controller_update)
+        self._throttle = StateWriteThrottle(
+            self.async_write_ha_state, lambda: data.moving_write_rate
+        )
+        self._cancel_rollback: Callable[[], None] | None = None
+        self._optimistic_from_pos: int | None = None
         self._attr_supported_features = (
             CoverEntityFeature.OPEN
             | CoverEntityFeature.CLOSE
@@ -79,46 +119,176 @@ class NiceCover(CoverEntity):
 
     async def async_open_cover(self, **kwargs) -> None:
         """Open the cover."""
-        await self.async_send_simple_command("move_up")
+        await self._async_move(1000, self.async_send_simple_command("move_up"))
 
     async def async_close_cover(self, **kwargs) -> None:
         """Close the cover"""
-        await self.async_send_simple_command("move_down")
+        await self._async_move(0, self.async_send_simple_command("move_down"))
 
     async def async_stop_cover(self, **kwargs) -> None:
         """Stop the cover"""
         await self.async_send_simple_command("stop")
+        if self._cancel_rollback is not None:
+            await self._async_undo_optimistic_state()
 
     async def async_set_cover_position(self, **kwargs) -> None:
         """Move to an int position - 0 is closed, 100 is fully open"""
         pos: int = kwargs[ATTR_POSITION] * 10  # pos of 1000 is fully up
-        await self._tt6_cover.send_pos_command(pos)
+        await self._async_move(pos, self._data.send_pos_command(pos))
 
     async def async_set_drop_percent(self, drop_percent_scaled: float) -> None:
         """Move to a percent position (thousandths accuracy) - 100% is fully down"""
         pos = round(drop_percent_scaled * 10.0)  # pos of 1000 is fully up
-        await self._tt6_cover.send_pos_command(pos)
+        await self._async_move(pos, self._data.send_pos_command(pos))
+
+    async def _async_move(self, target_pos: int, send: Awaitable[None]) -> None:
+        """Send a movement command, showing the target straight away if optimistic"""
+        # Until the Cover has reported, its pos is not known to differ
+        if self._data.optimistic and (
+            not self._data.state_reported or target_pos != self._cover.pos
+        ):
+            self._show_optimistic_target(target_pos)
+        try:
+            await send
+        except Exception:
+            if self._cancel_rollback is not None:
+                await self._async_undo_optimistic_state()
+            raise
+
+    def _show_optimistic_target(self, target_pos: int) -> None:
+        """Show the target until the Cover reports back or the timeout expires"""
+        if self._data.state_reported:
+            going_up = target_pos > self._cover.pos
+            going_down = not going_up
+        else:
+            going_up = going_down = False  # The direction is not known yet
+        self._data.travel.target_pos = target_pos
+        self._set_state(target_pos, going_up, going_down, False, False)
+        self._write_state(False)
+        self._cancel_optimistic_rollback()
+        self._optimistic_from_pos = self._cover.pos
+        self._cancel_rollback = async_call_later(
+            self.hass, self.OPTIMISTIC_TIMEOUT, self._async_rollback
+        )
+
+    async def _async_rollback(self, _now) -> None:
+        self._cancel_rollback = None
+        await self._async_undo_optimistic_state()
+
+    async def _async_undo_optimistic_state(self) -> None:
+        """Show the reported state again, or the restored one if none yet"""
+        self._cancel_optimistic_rollback()
+        if self._data.state_reported:
+            await self.handle_update()
+            return
+        self._attr_is_opening = False
+        self._attr_is_closing = False
+        self._attr_is_closed = None
+        self._attr_current_cover_position = None
+        self._attr_extra_state_attributes = {}
+        await self.async_restore_last_state()
+        self.async_write_ha_state()
+
+    def _cancel_optimistic_rollback(self) -> None:
+        if self._cancel_rollback is not None:
+            self._cancel_rollback()
+            self._cancel_rollback = None
 
     async def async_send_simple_command(self, command: str) -> None:
         """Send a simple command to the Cover"""
-        await self._tt6_cover.send_simple_command(command.upper())
+        await self._data.send_simple_command(command.upper())
 
     async def async_refresh_position(self) -> None:
         """Send a request for the current position"""
-        await self._tt6_cover.send_pos_request()
+        await self._data.send_pos_request()
+
+    @property
+    def available(self) -> bool:
+        """The cover is unavailable until its controller has connected"""
+        return self._data.controller.is_connected
 
     async def async_added_to_hass(self):
         """Register device notification."""
-        self._tt6_cover.cover.attach(self._updater)
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_REMOVE_COVER.format(self._cover_id),
+                self.async_remove,
+            )
+        )
+        self.async_on_remove(
+            self._data.dispatcher.add(self.hass, self.entity_id, self.handle_update)
+        )
+        motion_events = MotionEventTracker(self.hass, self._data, self.entity_id)
+        self.async_on_remove(
+            self._data.dispatcher.add(
+                self.hass,
+                f"{self.entity_id} motion events",
+                motion_events.handle_update,
+            )
+        )
+        self._data.controller.attach(self._controller_updater)
+        if self._data.state_reported:
+            await self.handle_update()
+        else:
+            await self.async_restore_last_state()
+
+    async def async_restore_last_state(self) -> None:
+        """Restore the last known position, marked stale until confirmed"""
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state not in (STATE_OPEN, STATE_CLOSED):
+            return
+        self._attr_is_closed = last_state.state == STATE_CLOSED
+        self._attr_current_cover_position = last_state.attributes.get(
+            ATTR_CURRENT_POSITION
+        )
+        if self._has_reverse_semantics:
+            self._attr_icon = last_state.attributes.get(ATTR_ICON)
+        self._attr_extra_state_attributes = {
+            ATTR_DROP_PERCENT: last_state.attributes.get(ATTR_DROP_PERCENT),
+            ATTR_STALE: True,
+        }
 
     async def async_will_remove_from_hass(self):
-        self._tt6_cover.cover.detach(self._updater)
+        self._data.controller.detach(self._controller_updater)
+        self._throttle.cancel()
+        self._cancel_optimistic_rollback()
+
+    async def handle_controller_update(self):
+        self.async_write_ha_state()
 
     async def handle_update(self):
+        if not self._data.state_reported:
+            # An Ack does not carry the position, so keep the restored state
+            return
+        if self._cancel_rollback is not None:
+            # The Ack of a command also marks the Cover as going up or down,
+            # so only a change of position replaces the target
+            if self._cover.pos == self._optimistic_from_pos:
+                return
+            self._cancel_optimistic_rollback()
+        self._set_state(
+            self._cover.pos,
+            self._cover.is_going_up,
+            self._cover.is_going_down,
+            self._cover.is_fully_up,
+            self._cover.is_fully_down,
+        )
+        self._write_state(self._cover.is_moving)
+
+    def _set_state(
+        self,
+        pos: int,
+        is_going_up: bool,
+        is_going_down: bool,
+        is_fully_up: bool,
+        is_fully_down: bool,
+    ) -> None:
         if self._has_reverse_semantics:
-            self._attr_is_opening = self._tt6_cover.cover.is_going_down
-            self._attr_is_closing = self._tt6_cover.cover.is_going_up
-            self._attr_is_closed = self._tt6_cover.cover.is_fully_up
+            self._attr_is_opening = is_going_down
+            self._attr_is_closing = is_going_up
+            self._attr_is_closed = is_fully_up
             if self._attr_is_opening:
                 self._attr_icon = "mdi:arrow-down-box"
             elif self._attr_is_closing:
@@ -128,10 +298,30 @@ class NiceCover(CoverEntity):
             else:
                 self._attr_icon = "mdi:projector-screen-variant-outline"
         else:
-            self._attr_is_opening = self._tt6_cover.cover.is_going_up
-            self._attr_is_closing = self._tt6_cover.cover.is_going_down
-            self._attr_is_closed = self._tt6_cover.cover.is_fully_down
-        self._attr_current_cover_position = (self._tt6_cover.cover.pos) // 10
-        drop_percent_scaled = self._tt6_cover.cover.pos / 10.0
-        self._attr_extra_state_attributes = {"drop_percent": drop_percent_scaled}
-        self.async_write_ha_state()
+            self._attr_is_opening = is_going_up
+            self._attr_is_closing = is_going_down
+            self._attr_is_closed = is_fully_down
+        self._attr_current_cover_position = pos // 10
+        self._attr_extra_state_attributes = {
+            ATTR_DROP_PERCENT: pos / 10.0,
+            ATTR_TIME_TO_TARGET: (
+                self._data.travel.time_to_target()
+                if self._data.state_reported
+                else None
+            ),
+        }
+
+    def _write_state(self, is_moving: bool) -> None:
+        # The time to target changes with every evaluation while moving, so
+        # it is written along with the rest of the state but not compared
+        self._throttle.write(
+            is_moving,
+            (
+                self._attr_is_opening,
+                self._attr_is_closing,
+                self._attr_is_closed,
+                self._attr_current_cover_position,
+                self.icon,
+                self._attr_extra_state_attributes[ATTR_DROP_PERCENT],
+            ),
+        )
@@ -0,0 +1,47 @@
+"""Diagnostics support for Nice"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import NiceData
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry"""
+    nd: NiceData = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "controllers": {
+            id: {
+                "name": controller.name,
+                "is_connected": controller.is_connected,
+                "queue_depth": controller.scheduler.queue_depth,
+                "average_wait_time": controller.scheduler.average_wait_time,
+                "dropped_count": controller.scheduler.dropped_count,
+            }
+            for id, controller in nd.controllers.items()
+        },
+        "covers": {
+            id: {
+                "name": nice_cover.cover.name,
+                "state_reported": nice_cover.state_reported,
+                "pos": nice_cover.cover.pos,
+                "handler_times": nice_cover.dispatcher.handler_times,
+            }
+            for id, nice_cover in nd.nice_covers.items()
+        },
+        "ciw_helpers": {
+            id: {
+                "name": ciw_data.name,
+                "handler_times": ciw_data.dispatcher.handler_times,
+            }
+            for id, ciw_data in nd.ciw_helpers.items()
+        },
+    }
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, List
+from typing import Callable, Iterable, List
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
-from homeassistant.const import UnitOfLength
+from homeassistant.const import EntityCategory, UnitOfLength, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.util.unit_system import METRIC_SYSTEM
-from nicett6.ciw_helper import CIWHelper
 from nicett6.cover import Cover
 
-from . import EntityUpdater, NiceData
-from .const import DOMAIN
+from . import (
+    CIWValues,
+    CommandScheduler,
+    EntityUpdater,
+    NiceCIWData,
+    NiceControllerWrapper,
+    NiceCoverData,
+    NiceData,
+    StateWriteThrottle,
+)
+from .const import (
+    ATTR_STALE,
+    DOMAIN,
+    SIGNAL_ADD_CIW_HELPERS,
+    SIGNAL_ADD_CONTROLLERS,
+    SIGNAL_ADD_COVERS,
+    SIGNAL_REMOVE_CIW_HELPER,
+    SIGNAL_REMOVE_CONTROLLER,
+    SIGNAL_REMOVE_COVER,
+)
 
 
 @dataclass(frozen=True)
 class NiceCIWSensorEntityDescriptionMixIn:
-    value_fn: Callable[[CIWHelper], float | None]
+    value_fn: Callable[[CIWValues], float | None]
 
 
 @dataclass(frozen=True)
@@ -28,10 +49,12 @@ class NiceCIWSensorEntityDescription(
 ):
     """Describes a Nice TT6 CIW Sensor"""
 
+    has_deadband: bool = False
+
 
 @dataclass(frozen=True)
 class NiceCoverSensorEntityDescriptionMixIn:
-    value_fn: Callable[[Cover], float | None]
+    value_fn: Callable[[NiceCoverData], float | None]
 
 
 @dataclass(frozen=True)
@@ -40,6 +63,44 @@ class NiceCoverSensorEntityDescription(
 ):
     """Describes a Nice TT6 Cover"""
 
+    has_deadband: bool = False
+    # Overrides the moving write rate setting
+    moving_write_interval: float | None = None
+
+
+@dataclass(frozen=True)
+class NiceControllerSensorEntityDescriptionMixIn:
+    value_fn: Callable[[CommandScheduler], float | None]
+
+
+@dataclass(frozen=True)
+class NiceControllerSensorEntityDescription(
+    SensorEntityDescription, NiceControllerSensorEntityDescriptionMixIn
+):
+    """Describes a Nice TT6 Controller Sensor"""
+
+
+def deadband_state(
+    value: float | None,
+    written_state: tuple | None,
+    deadband: float,
+    is_moving: bool,
+) -> tuple[float | None]:
+    """The state to write; while moving, a change within the deadband is ignored"""
+    if is_moving and deadband > 0.0 and written_state is not None:
+        written_value = written_state[0]
+        if (
+            value is not None
+            and written_value is not None
+            and abs(value - written_value) < deadband
+        ):
+            return written_state
+    return (value,)
+
+
+# Seconds between the states of a statistics sensor while moving
+DROP_STATISTICS_INTERVAL = 60.0
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the entities."""
@@ -58,7 +119,8 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             icon="mdi:arrow-expand-vertical",
             native_unit_of_measurement=native_length_unit,
             device_class=SensorDeviceClass.DISTANCE,
-            value_fn=lambda ciw_helper: ciw_helper.image_height,
+            value_fn=lambda values: values.image_height,
+            has_deadband=True,
         ),
         NiceCIWSensorEntityDescription(
             key="image_width",
@@ -66,7 +128,8 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             icon="mdi:arrow-expand-horizontal",
             native_unit_of_measurement=native_length_unit,
             device_class=SensorDeviceClass.DISTANCE,
-            value_fn=lambda ciw_helper: ciw_helper.image_width,
+            value_fn=lambda values: values.image_width,
+            has_deadband=True,
         ),
         NiceCIWSensorEntityDescription(
             key="image_diagonal",
@@ -75,14 +138,15 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             # Diagonal unit can be set to inches from the Entity Configuration
             native_unit_of_measurement=native_length_unit,
             device_class=SensorDeviceClass.DISTANCE,
-            value_fn=lambda ciw_helper: ciw_helper.image_diagonal,
+            value_fn=lambda values: values.image_diagonal,
+            has_deadband=True,
         ),
         NiceCIWSensorEntityDescription(
             key="image_aspect_ratio",
             name="Image Aspect Ratio",
             icon="mdi:aspect-ratio",
             native_unit_of_measurement=":1",
-            value_fn=lambda ciw_helper: ciw_helper.aspect_ratio,
+            value_fn=lambda values: values.aspect_ratio,
         ),
     ]
 
@@ -93,87 +157,287 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             icon="mdi:arrow-collapse-down",
             native_unit_of_measurement=native_length_unit,
             device_class=SensorDeviceClass.DISTANCE,
-            value_fn=lambda cover: cover.drop,
-        )
+            value_fn=lambda data: data.cover.drop,
+            has_deadband=True,
+        ),
+        NiceCoverSensorEntityDescription(
+            key="drop_statistics",
+            name="Drop Statistics",
+            icon="mdi:chart-line",
+            native_unit_of_measurement=native_length_unit,
+            device_class=SensorDeviceClass.DISTANCE,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_registry_enabled_default=False,
+            value_fn=lambda data: data.cover.drop,
+            moving_write_interval=DROP_STATISTICS_INTERVAL,
+        ),
+        NiceCoverSensorEntityDescription(
+            key="time_to_target",
+            name="Time To Target",
+            icon="mdi:timer-outline",
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+            device_class=SensorDeviceClass.DURATION,
+            suggested_display_precision=1,
+            value_fn=lambda data: data.travel.time_to_target(),
+        ),
+    ]
+
+    controller_descriptions: List[NiceControllerSensorEntityDescription] = [
+        NiceControllerSensorEntityDescription(
+            key="queue_depth",
+            name="Queue Depth",
+            icon="mdi:tray-full",
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            value_fn=lambda scheduler: scheduler.queue_depth,
+        ),
+        NiceControllerSensorEntityDescription(
+            key="command_wait_time",
+            name="Command Wait Time",
+            icon="mdi:timer-sand",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            value_fn=lambda scheduler: round(scheduler.average_wait_time * 1000.0, 1),
+        ),
     ]
 
-    async_add_entities(
-        [
-            NiceCIWSensor(id, entity_description, item.screen_cover_id, item.ciw_helper)
-            for id, item in data.ciw_helpers.items()
-            for entity_description in ciw_sensor_descriptions
-        ]
+    @callback
+    def async_add_controller_sensors(controller_ids: Iterable[str]) -> None:
+        async_add_entities(
+            [
+                NiceControllerSensor(id, entity_description, data.controllers[id])
+                for id in controller_ids
+                for entity_description in controller_descriptions
+            ]
+        )
+
+    async_add_controller_sensors(data.controllers.keys())
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADD_CONTROLLERS.format(config_entry.entry_id),
+            async_add_controller_sensors,
+        )
     )
 
-    async_add_entities(
-        [
-            NiceCoverSensor(id, entity_description, item.tt6_cover.cover)
-            for id, item in data.nice_covers.items()
-            for entity_description in cover_descriptions
-        ]
+    @callback
+    def async_add_ciw_sensors(ciw_ids: Iterable[str]) -> None:
+        async_add_entities(
+            [
+                NiceCIWSensor(id, entity_description, data.ciw_helpers[id])
+                for id in ciw_ids
+                for entity_description in ciw_sensor_descriptions
+            ]
+        )
+
+    async_add_ciw_sensors(data.ciw_helpers.keys())
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADD_CIW_HELPERS.format(config_entry.entry_id),
+            async_add_ciw_sensors,
+        )
     )
 
+    @callback
+    def async_add_cover_sensors(cover_ids: Iterable[str]) -> None:
+        async_add_entities(
+            [
+                NiceCoverSensor(id, entity_description, data.nice_covers[id])
+                for id in cover_ids
+                for entity_description in cover_descriptions
+            ]
+        )
+
+    async_add_cover_sensors(data.nice_covers.keys())
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_ADD_COVERS.format(config_entry.entry_id),
+            async_add_cover_sensors,
+        )
+    )
 
-class NiceCIWSensor(SensorEntity):
+
+class NiceCIWSensor(RestoreSensor):
     """Nice TT6 CIW Sensor."""
 
     def __init__(
         self,
         ciw_id: str,
         entity_description: NiceCIWSensorEntityDescription,
-        screen_cover_id: str,
-        ciw_helper: CIWHelper,
+        data: NiceCIWData,
     ) -> None:
         """A Sensor for a CIWHelper property."""
         self.entity_description: NiceCIWSensorEntityDescription = entity_description
         self._attr_unique_id = f"{ciw_id}_{entity_description.key}"
+        self._ciw_id = ciw_id
         self._attr_should_poll = False
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, screen_cover_id)}
+            "identifiers": {(DOMAIN, data.screen_cover_id)}
         }  # Image area is part of screen
         self._attr_has_entity_name = True
-        self._helper: CIWHelper = ciw_helper
-        self._updater = EntityUpdater(self.handle_update)
+        self._data: NiceCIWData = data
+        self._throttle = StateWriteThrottle(
+            self.async_write_ha_state, lambda: data.moving_write_rate
+        )
 
     async def async_added_to_hass(self):
         """Register device notification."""
-        self._helper.screen.attach(self._updater)
-        self._helper.mask.attach(self._updater)
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_REMOVE_CIW_HELPER.format(self._ciw_id),
+                self.async_remove,
+            )
+        )
+        self.async_on_remove(
+            self._data.dispatcher.add(self.hass, self.entity_id, self.handle_update)
+        )
+        if self._data.state_reported:
+            await self.handle_update()
+        else:
+            await self.async_restore_last_value()
+
+    async def async_restore_last_value(self) -> None:
+        """Restore the last known value, marked stale until confirmed"""
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is not None:
+            self._attr_native_value = last_sensor_data.native_value
+            self._attr_extra_state_attributes = {ATTR_STALE: True}
 
     async def async_will_remove_from_hass(self):
-        self._helper.screen.detach(self._updater)
-        self._helper.mask.detach(self._updater)
+        self._throttle.cancel()
 
     async def handle_update(self):
-        self._attr_native_value = self.entity_description.value_fn(self._helper)
-        self.async_write_ha_state()
+        is_moving = self._data.is_moving
+        state = deadband_state(
+            self.entity_description.value_fn(self._data.values),
+            self._throttle.written_state,
+            self._data.sensor_deadband if self.entity_description.has_deadband else 0.0,
+            is_moving,
+        )
+        self._attr_native_value = state[0]
+        self._attr_extra_state_attributes = None
+        self._throttle.write(is_moving, state)
 
 
-class NiceCoverSensor(SensorEntity):
+class NiceCoverSensor(RestoreSensor):
     """Nice TT6 Cover Sensor."""
 
     def __init__(
         self,
         cover_id: str,
         entity_description: NiceCoverSensorEntityDescription,
-        cover: Cover,
+        data: NiceCoverData,
     ) -> None:
         """A Sensor for a Cover property."""
         self.entity_description: NiceCoverSensorEntityDescription = entity_description
         self._attr_unique_id = f"{cover_id}_{entity_description.key}"
+        self._cover_id = cover_id
         self._attr_should_poll = False
         self._attr_device_info = {"identifiers": {(DOMAIN, cover_id)}}
         self._attr_has_entity_name = True
-        self._cover: Cover = cover
-        self._updater = EntityUpdater(self.handle_update)
+        self._data: NiceCoverData = data
+        self._cover: Cover = data.cover
+        self._controller_updater = EntityUpdater(self.handle_controller_update)
+        self._throttle = StateWriteThrottle(self.async_write_ha_state, self._rate)
+
+    def _rate(self) -> float:
+        interval = self.entity_description.moving_write_interval
+        return self._data.moving_write_rate if interval is None else 1.0 / interval
+
+    @property
+    def available(self) -> bool:
+        """The sensor is unavailable until the controller has connected"""
+        return self._data.controller.is_connected
 
     async def async_added_to_hass(self):
         """Register device notification."""
-        self._cover.attach(self._updater)
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_REMOVE_COVER.format(self._cover_id),
+                self.async_remove,
+            )
+        )
+        self.async_on_remove(
+            self._data.dispatcher.add(self.hass, self.entity_id, self.handle_update)
+        )
+        self._data.controller.attach(self._controller_updater)
+        if self._data.state_reported:
+            await self.handle_update()
+        else:
+            await self.async_restore_last_value()
+
+    async def async_restore_last_value(self) -> None:
+        """Restore the last known value, marked stale until confirmed"""
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is not None:
+            self._attr_native_value = last_sensor_data.native_value
+            self._attr_extra_state_attributes = {ATTR_STALE: True}
 
     async def async_will_remove_from_hass(self):
-        self._cover.detach(self._updater)
+        self._data.controller.detach(self._controller_updater)
+        self._throttle.cancel()
 
-    async def handle_update(self):
-        self._attr_native_value = self.entity_description.value_fn(self._cover)
+    async def handle_controller_update(self):
         self.async_write_ha_state()
+
+    async def handle_update(self):
+        is_moving = self._cover.is_moving
+        state = deadband_state(
+            self.entity_description.value_fn(self._data),
+            self._throttle.written_state,
+            self._data.sensor_deadband if self.entity_description.has_deadband else 0.0,
+            is_moving,
+        )
+        self._attr_native_value = state[0]
+        self._attr_extra_state_attributes = None
+        self._throttle.write(is_moving, state)
+
+
+class NiceControllerSensor(SensorEntity):
+    """Nice TT6 Controller diagnostic Sensor."""
+
+    def __init__(
+        self,
+        controller_id: str,
+        entity_description: NiceControllerSensorEntityDescription,
+        controller: NiceControllerWrapper,
+    ) -> None:
+        """A Sensor for a property of the command scheduler of a controller."""
+        self.entity_description: NiceControllerSensorEntityDescription = (
+            entity_description
+        )
+        self._attr_unique_id = f"{controller_id}_{entity_description.key}"
+        self._controller_id = controller_id
+        self._attr_should_poll = True
+        self._attr_device_info = {"identifiers": {(DOMAIN, controller_id)}}
+        self._attr_has_entity_name = True
+        self._controller = controller
+
+    @property
+    def available(self) -> bool:
+        return self._controller.is_connected
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_REMOVE_CONTROLLER.format(self._controller_id),
+                self.async_remove,
+            )
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        return self.entity_description.value_fn(self._controller.scheduler)
@@ -22,6 +22,7 @@ from custom_components.nice.const import (
     ACTION_ADD_PRESET,
     ACTION_DEL_CIW,
     ACTION_DEL_PRESET,
+    ACTION_SETTINGS,
     CONF_ACTION,
     CONF_CIW_HELPERS,
     CONF_IMAGE_ASPECT_RATIO_OTHER,
@@ -32,6 +33,7 @@ from custom_components.nice.const import (
 TEST_TITLE = "Nice TT6 Test"
 
 CONTROLLER_1_ID = "controller_1_id"
+CONTROLLER_2_ID = "controller_2_id"
 COVER_1_ID = "cover_1_id"
 COVER_2_ID = "cover_2_id"
 CIW_HELPER_ID = "ciw_1_id"
@@ -71,6 +73,11 @@ TEST_CONTROLLER_1 = {
     "serial_port": "socket://localhost:50200",
 }
 
+TEST_CONTROLLER_2 = {
+    "name": "Controller 2 Test",
+    "serial_port": "socket://localhost:50201",
+}
+
 
 TEST_PARTIAL_SCREEN = {
     "name": "Screen",
@@ -328,6 +335,26 @@ def options_step_select_action(options_flow_state_override):
     options_flow_state_override["step_id"] = "select_action"
 
 
+@pytest.fixture
+def options_step_add_controller(options_flow_state_override):
+    options_flow_state_override["step_id"] = "add_controller"
+
+
+@pytest.fixture
+def options_step_change_serial_port(options_flow_state_override):
+    options_flow_state_override["step_id"] = "change_serial_port"
+
+
+@pytest.fixture
+def options_step_add_cover(options_flow_state_override):
+    options_flow_state_override["step_id"] = "add_cover"
+
+
+@pytest.fixture
+def options_step_del_cover(options_flow_state_override):
+    options_flow_state_override["step_id"] = "del_cover"
+
+
 @pytest.fixture
 def options_step_add_ciw_helper(options_flow_state_override):
     options_flow_state_override["step_id"] = "add_ciw_helper"
@@ -353,6 +380,11 @@ def options_step_del_preset(options_flow_state_override):
     options_flow_state_override["step_id"] = "del_preset"
 
 
+@pytest.fixture
+def options_step_settings(options_flow_state_override):
+    options_flow_state_override["step_id"] = "settings"
+
+
 @pytest.fixture
 def config_set_title(config_flow_state_override):
     config_flow_state_override["title"] = TEST_TITLE
@@ -1211,3 +1243,245 @@ async def test_del_preset(
         "ciw_helpers": {},
         "presets": {},
     }
+
+
+async def test_menu_settings(
+    hass: HomeAssistant,
+    options_step_select_action,
+    config_add_controller_1,
+    config_add_screen,
+    options_flow_id,
+) -> None:
+    """Verify Settings menu item."""
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id, user_input={CONF_ACTION: ACTION_SETTINGS}
+    )
+    assert result.get("errors") == {}
+    assert result.get("type") == FlowResultType.FORM
+    assert result.get("step_id") == "settings"
+
+
+async def test_settings(
+    hass: HomeAssistant,
+    options_step_settings,
+    config_add_controller_1,
+    config_add_screen,
+    config_add_mask,
+    options_add_preset_1,
+    options_flow_id,
+) -> None:
+    """Test Settings action."""
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input={
+            "connect_timeout": 5.0,
+            "background_connect": True,
+            "pos_command_window": 0.5,
+            "moving_write_rate": 4.0,
+            "sensor_deadband": 0.01,
+            "optimistic": True,
+            "poll_budget": 2.0,
+            "coordinated_moves": True,
+        },
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert result.get("title") == ""
+    assert result.get("result") == True
+    assert result.get("data") == {
+        "ciw_helpers": {},
+        "presets": {PRESET_1_ID: TEST_PRESET_1},
+        "settings": {
+            "connect_timeout": 5.0,
+            "background_connect": True,
+            "pos_command_window": 0.5,
+            "moving_write_rate": 4.0,
+            "sensor_deadband": 0.01,
+            "optimistic": True,
+            "poll_budget": 2.0,
+            "coordinated_moves": True,
+        },
+    }
+
+
+async def test_add_controller(
+    mocker,
+    hass: HomeAssistant,
+    options_step_add_controller,
+    config_add_controller_1,
+    config_add_screen,
+    options_add_preset_1,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Add Controller action."""
+    mocker.patch(
+        "custom_components.nice.config_flow.open_connection",
+        new=dummy_open_connection,
+    )
+    mocker.patch(
+        "custom_components.nice.config_flow.make_id",
+        return_value=CONTROLLER_2_ID,
+    )
+
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input=TEST_CONTROLLER_2,
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert result.get("data") == {
+        "ciw_helpers": {},
+        "presets": {PRESET_1_ID: TEST_PRESET_1},
+    }
+    assert config_entry.data["controllers"] == {
+        CONTROLLER_1_ID: TEST_CONTROLLER_1,
+        CONTROLLER_2_ID: TEST_CONTROLLER_2,
+    }
+
+
+async def test_add_controller_invalid_port(
+    mocker,
+    hass: HomeAssistant,
+    options_step_add_controller,
+    config_add_controller_1,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Add Controller action with an invalid serial port."""
+    mocker.patch(
+        "custom_components.nice.config_flow.open_connection",
+        side_effect=ValueError,
+    )
+
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input=TEST_CONTROLLER_2,
+    )
+
+    assert result.get("errors") == {"base": "cannot_connect"}
+    assert result.get("type") == FlowResultType.FORM
+    assert result.get("step_id") == "add_controller"
+    assert config_entry.data["controllers"] == {CONTROLLER_1_ID: TEST_CONTROLLER_1}
+
+
+async def test_change_serial_port(
+    mocker,
+    hass: HomeAssistant,
+    options_step_change_serial_port,
+    config_add_controller_1,
+    config_add_screen,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Change Serial Port action."""
+    mocker.patch(
+        "custom_components.nice.config_flow.open_connection",
+        new=dummy_open_connection,
+    )
+
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input={"controller": CONTROLLER_1_ID, "serial_port": "/dev/ttyUSB1"},
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert config_entry.data["controllers"] == {
+        CONTROLLER_1_ID: {"name": "Controller 1 Test", "serial_port": "/dev/ttyUSB1"}
+    }
+    assert config_entry.data["covers"] == {COVER_1_ID: TEST_SCREEN}
+
+
+async def test_add_cover(
+    mocker,
+    hass: HomeAssistant,
+    options_step_add_cover,
+    config_add_controller_1,
+    config_add_screen,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Add Cover action."""
+    mocker.patch(
+        "custom_components.nice.config_flow.make_id",
+        return_value=COVER_2_ID,
+    )
+
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input=MASK_COVER_INPUT,
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert config_entry.data["covers"] == {
+        COVER_1_ID: TEST_SCREEN,
+        COVER_2_ID: TEST_MASK,
+    }
+
+
+async def test_add_cover_with_image_area(
+    mocker,
+    hass: HomeAssistant,
+    options_step_add_cover,
+    config_add_controller_1,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Add Cover action for a Cover with an Image Area."""
+    mocker.patch(
+        "custom_components.nice.config_flow.make_id",
+        return_value=COVER_1_ID,
+    )
+
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input=SCREEN_COVER_INPUT,
+    )
+
+    assert result.get("errors") == {}
+    assert result.get("type") == FlowResultType.FORM
+    assert result.get("step_id") == "cover_image_area"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={
+            "image_border_below": 0.05,
+            "image_height": 1.57,
+            "image_aspect_ratio_choice": "aspect_ratio_16_9",
+        },
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert config_entry.data["covers"] == {COVER_1_ID: TEST_SCREEN}
+
+
+async def test_del_cover(
+    hass: HomeAssistant,
+    options_step_del_cover,
+    config_add_controller_1,
+    config_add_screen,
+    config_add_mask,
+    options_add_ciw_helper,
+    options_add_preset_1,
+    options_add_preset_2,
+    config_entry,
+    options_flow_id,
+) -> None:
+    """Test Del Cover action removes the CIW Helpers and drops that use it."""
+    result = await hass.config_entries.options.async_configure(
+        options_flow_id,
+        user_input={"select": [COVER_2_ID]},
+    )
+
+    assert result.get("type") == FlowResultType.CREATE_ENTRY
+    assert result.get("data") == {
+        "ciw_helpers": {},
+        "presets": {
+            PRESET_1_ID: TEST_PARTIAL_PRESET_1_ONE_DROP,
+            PRESET_2_ID: {
+                "name": "Preset 2",
+                "drops": [{"cover": COVER_1_ID, "drop": 0.0}],
+            },
+        },
+    }
+    assert config_entry.data["covers"] == {COVER_1_ID: TEST_SCREEN}
@@ -1,9 +1,1484 @@
 """Test component setup."""
+import asyncio
+from datetime import timedelta
+from functools import partial
+from unittest.mock import AsyncMock
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
 from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from nicett6.command_code import CommandCode
+from nicett6.cover import Cover
+from nicett6.decode import AckResponse, PctAckResponse, PctPosResponse
+from nicett6.tt6_connection import TT6Writer
+from nicett6.tt6_cover import TT6Cover
+from nicett6.utils import AsyncObservable
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
 
+import custom_components.nice
+from custom_components.nice import (
+    CommandScheduler,
+    EntityDispatcher,
+    EntityUpdater,
+    MotionPoller,
+    NiceControllerWrapper,
+    PollBudget,
+    TravelModel,
+    async_send_pos_commands,
+    group_by_controller,
+)
 from custom_components.nice.const import DOMAIN
+from custom_components.nice.cover import NiceCover
+from custom_components.nice.diagnostics import async_get_config_entry_diagnostics
+
+CONTROLLER_1_ID = "controller_1_id"
+CONTROLLER_2_ID = "controller_2_id"
+COVER_1_ID = "cover_1_id"
+COVER_2_ID = "cover_2_id"
+CIW_HELPER_ID = "ciw_1_id"
+PRESET_1_ID = "preset_1_id"
+
+SLOW_PORT = "socket://slow:50200"
+DEAD_PORT = "socket://dead:50200"
+LATE_PORT = "socket://late:50200"
+QUIET_PORT = "socket://quiet:50200"
+
+REPORTED_POS = 500
+
+
+def make_config_data(serial_port_1, serial_port_2):
+    return {
+        "controllers": {
+            CONTROLLER_1_ID: {"name": "Controller 1", "serial_port": serial_port_1},
+            CONTROLLER_2_ID: {"name": "Controller 2", "serial_port": serial_port_2},
+        },
+        "covers": {
+            COVER_1_ID: {
+                "name": "Screen",
+                "controller": CONTROLLER_1_ID,
+                "address": 2,
+                "node": 4,
+                "drop": 1.8,
+                "image_area": {
+                    "image_border_below": 0.05,
+                    "image_height": 1.57,
+                    "image_aspect_ratio_choice": "aspect_ratio_16_9",
+                    "image_aspect_ratio_other": None,
+                },
+                "has_reverse_semantics": False,
+            },
+            COVER_2_ID: {
+                "name": "Mask",
+                "controller": CONTROLLER_2_ID,
+                "address": 3,
+                "node": 4,
+                "drop": 0.5,
+                "image_area": None,
+                "has_reverse_semantics": False,
+            },
+        },
+    }
+
+
+class FakeCoverManager:
+    """Records the sequence of open calls for each serial port"""
+
+    events: list[tuple[str, str]] = []
+    instances: list["FakeCoverManager"] = []
+    late_port_ready: asyncio.Event
+
+    def __init__(self, serial_port):
+        self.serial_port = serial_port
+        self.is_open = False
+        self.tt6_covers = []
+        FakeCoverManager.instances.append(self)
+
+    async def open(self):
+        FakeCoverManager.events.append(("open_started", self.serial_port))
+        if self.serial_port == DEAD_PORT:
+            await asyncio.Event().wait()
+        elif self.serial_port == LATE_PORT:
+            await FakeCoverManager.late_port_ready.wait()
+        await asyncio.sleep(0.05)
+        self.is_open = True
+        FakeCoverManager.events.append(("open_finished", self.serial_port))
+
+    async def close(self):
+        for tt6_cover in self.tt6_covers:
+            await tt6_cover.stop_notifier()
+        self.tt6_covers = []
+        self.is_open = False
+
+    async def message_tracker(self):
+        if self.serial_port == QUIET_PORT:
+            return
+        for tt6_cover in self.tt6_covers:
+            await tt6_cover.handle_response_message(
+                PctPosResponse(tt6_cover.tt_addr, REPORTED_POS)
+            )
+
+    async def reconnect(self):
+        FakeCoverManager.events.append(("reconnect", self.serial_port))
+
+    async def add_cover(self, tt_addr, cover):
+        tt6_cover = TT6Cover(tt_addr, cover, AsyncMock(spec=TT6Writer))
+        self.tt6_covers.append(tt6_cover)
+        return tt6_cover
+
+
+@pytest.fixture
+def fake_cover_manager(mocker):
+    FakeCoverManager.events = []
+    FakeCoverManager.instances = []
+    FakeCoverManager.late_port_ready = asyncio.Event()
+    mocker.patch("custom_components.nice.CoverManager", new=FakeCoverManager)
+    return FakeCoverManager
+
+
+async def setup_entry(hass, data, options) -> MockConfigEntry:
+    config_entry = MockConfigEntry(domain=DOMAIN, data=data, options=options)
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+async def test_controllers_opened_concurrently(
+    hass: HomeAssistant, fake_cover_manager
+) -> None:
+    """Both controllers start opening before either one finishes."""
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert [e[0] for e in fake_cover_manager.events] == [
+        "open_started",
+        "open_started",
+        "open_finished",
+        "open_finished",
+    ]
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_dead_controller_times_out(
+    hass: HomeAssistant, fake_cover_manager
+) -> None:
+    """A controller that never opens is retried in the background."""
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, DEAD_PORT),
+        {"settings": {"connect_timeout": 0.2}},
+    )
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert ("open_finished", SLOW_PORT) in fake_cover_manager.events
+    assert hass.states.get("cover.screen").state != STATE_UNAVAILABLE
+    assert hass.states.get("cover.mask").state == STATE_UNAVAILABLE
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    assert nd.controllers[CONTROLLER_2_ID]._connect_task is not None
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert all(not cm.is_open for cm in fake_cover_manager.instances)
+
+
+async def test_all_controllers_dead_retries_setup(
+    hass: HomeAssistant, fake_cover_manager
+) -> None:
+    """Setup is retried if no controller can be opened."""
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(DEAD_PORT, DEAD_PORT),
+        {"settings": {"connect_timeout": 0.2}},
+    )
+
+    assert config_entry.state is ConfigEntryState.SETUP_RETRY
+    assert all(not cm.is_open for cm in fake_cover_manager.instances)
+
+
+async def test_background_connect(hass: HomeAssistant, fake_cover_manager) -> None:
+    """Setup completes at once and entities become available on connection."""
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, LATE_PORT),
+        {"settings": {"background_connect": True}},
+    )
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+    assert hass.states.get("cover.screen").state != STATE_UNAVAILABLE
+    assert hass.states.get("cover.mask").state == STATE_UNAVAILABLE
+    assert hass.states.get("sensor.mask_drop").state == STATE_UNAVAILABLE
+
+    fake_cover_manager.late_port_ready.set()
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("cover.mask").state != STATE_UNAVAILABLE
+    assert hass.states.get("sensor.mask_drop").state != STATE_UNAVAILABLE
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_background_connect_unload_while_connecting(
+    hass: HomeAssistant, fake_cover_manager
+) -> None:
+    """A controller that is still connecting is cancelled on unload."""
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, DEAD_PORT),
+        {"settings": {"background_connect": True}},
+    )
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("cover.mask").state == STATE_UNAVAILABLE
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert all(not cm.is_open for cm in fake_cover_manager.instances)
+
+
+async def test_positions_tracked_before_entities_added(
+    hass: HomeAssistant, fake_cover_manager
+) -> None:
+    """Positions reported before the entities are added are applied."""
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+
+    state = hass.states.get("cover.screen")
+    assert state.attributes["current_position"] == REPORTED_POS // 10
+    assert state.attributes["drop_percent"] == REPORTED_POS / 10.0
+    assert float(hass.states.get("sensor.mask_drop").state) == 0.25
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_reconnect_syncs_positions(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Positions are requested for every cover after a reconnect."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    tt6_covers = [c for cm in fake_cover_manager.instances for c in cm.tt6_covers]
+    for tt6_cover in tt6_covers:
+        tt6_cover.writer.send_web_pos_request.assert_not_called()
+
+    await hass.services.async_call(DOMAIN, "reconnect", blocking=True)
+
+    assert [e[0] for e in fake_cover_manager.events].count("reconnect") == 2
+    for tt6_cover in tt6_covers:
+        tt6_cover.writer.send_web_pos_request.assert_called_once_with(tt6_cover.tt_addr)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_sync_positions_joins_sync_in_progress(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """A second sync while one is in flight does not repeat the requests."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    controller = hass.data[DOMAIN][config_entry.entry_id].controllers[CONTROLLER_1_ID]
+
+    task1 = controller.sync_positions()
+    task2 = controller.sync_positions()
+    assert task1 is task2
+    assert not controller.positions_synced.is_set()
+    await task1
+    assert controller.positions_synced.is_set()
+
+    tt6_cover = next(iter(controller.tt6_covers.values()))
+    tt6_cover.writer.send_web_pos_request.assert_called_once()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_sync_positions_waits_for_pos_response(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """An Ack or an idle notification does not count as a position report."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 1.0)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    controller = hass.data[DOMAIN][config_entry.entry_id].controllers[CONTROLLER_1_ID]
+    tt6_cover = next(iter(controller.tt6_covers.values()))
+
+    task = controller.sync_positions()
+    await asyncio.sleep(0.01)
+    await tt6_cover.handle_response_message(
+        AckResponse(tt6_cover.tt_addr, CommandCode.MOVE_UP)
+    )
+    await tt6_cover.cover.set_idle()
+    assert not controller.positions_synced.is_set()
+
+    await tt6_cover.handle_response_message(PctPosResponse(tt6_cover.tt_addr, 600))
+    assert controller.positions_synced.is_set()
+    await task
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_restore_last_state(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Last known states are restored and marked stale until reported."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(
+                    "cover.mask",
+                    "open",
+                    {"current_position": 40, "drop_percent": 40.5},
+                ),
+                {},
+            ),
+            (
+                State("sensor.mask_drop", "0.3"),
+                {"native_value": 0.3, "native_unit_of_measurement": "m"},
+            ),
+        ],
+    )
+    config_entry = await setup_entry(hass, make_config_data(SLOW_PORT, QUIET_PORT), {})
+
+    state = hass.states.get("cover.mask")
+    assert state.state == "open"
+    assert state.attributes["current_position"] == 40
+    assert state.attributes["drop_percent"] == 40.5
+    assert state.attributes["stale"] is True
+    state = hass.states.get("sensor.mask_drop")
+    assert float(state.state) == 0.3
+    assert state.attributes["stale"] is True
+
+    state = hass.states.get("cover.screen")
+    assert "stale" not in state.attributes
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+CIW_OPTIONS = {
+    "ciw_helpers": {
+        CIW_HELPER_ID: {
+            "name": "CIW Helper",
+            "screen_cover": COVER_1_ID,
+            "mask_cover": COVER_2_ID,
+        }
+    },
+    "presets": {},
+}
+
+PRESET_OPTIONS = {
+    **CIW_OPTIONS,
+    "presets": {
+        PRESET_1_ID: {
+            "name": "Preset 1",
+            "drops": [{"cover": COVER_1_ID, "drop": 1.77}],
+        }
+    },
+}
+
+
+async def apply_options(hass: HomeAssistant, config_entry, *options_list) -> None:
+    for options in options_list:
+        hass.config_entries.async_update_entry(config_entry, options=options)
+        await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    await hass.async_block_till_done()
+
+
+async def test_options_applied_without_reload(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Options changes are applied without reopening the controllers."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    apply_options_spy = mocker.spy(custom_components.nice, "_async_apply_options")
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    assert hass.states.get("sensor.screen_image_height") is None
+    assert not hass.services.has_service(DOMAIN, "apply_preset")
+
+    await apply_options(hass, config_entry, CIW_OPTIONS, PRESET_OPTIONS)
+
+    assert apply_options_spy.call_count == 1
+    assert hass.states.get("sensor.screen_image_height") is not None
+    assert hass.services.has_service(DOMAIN, "apply_preset")
+    assert len(fake_cover_manager.instances) == 2
+    assert all(cm.is_open for cm in fake_cover_manager.instances)
+
+    await apply_options(hass, config_entry, {"ciw_helpers": {}, "presets": {}})
+
+    assert apply_options_spy.call_count == 2
+    assert hass.states.get("sensor.screen_image_height") is None
+    assert not hass.services.has_service(DOMAIN, "apply_preset")
+    assert [e[0] for e in fake_cover_manager.events].count("open_started") == 2
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def apply_data(hass: HomeAssistant, config_entry, data, options=None) -> None:
+    hass.config_entries.async_update_entry(config_entry, data=data)
+    if options is not None:
+        hass.config_entries.async_update_entry(config_entry, options=options)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+    await hass.async_block_till_done()
+
+
+BLIND_COVER = {
+    "name": "Blind",
+    "controller": CONTROLLER_1_ID,
+    "address": 4,
+    "node": 4,
+    "drop": 2.0,
+    "image_area": None,
+    "has_reverse_semantics": False,
+}
+
+
+async def test_services_removed_on_unload(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """The services stay until the last entry is unloaded."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    services = (
+        "move_and_wait",
+        "move_covers",
+        "reconnect",
+        "set_aspect_ratio",
+        "set_image_height",
+    )
+    config_entry_1 = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    blind_controller = {"name": "Controller 3", "serial_port": SLOW_PORT + "1"}
+    config_entry_2 = await setup_entry(
+        hass,
+        {
+            "controllers": {"controller_3_id": blind_controller},
+            "covers": {"cover_3_id": {**BLIND_COVER, "controller": "controller_3_id"}},
+        },
+        {},
+    )
+    assert all(hass.services.has_service(DOMAIN, s) for s in services)
+
+    assert await hass.config_entries.async_unload(config_entry_1.entry_id)
+    assert all(hass.services.has_service(DOMAIN, s) for s in services)
+    await hass.services.async_call(DOMAIN, "reconnect", blocking=True)
+    assert [e[0] for e in fake_cover_manager.events].count("reconnect") == 1
+
+    assert await hass.config_entries.async_unload(config_entry_2.entry_id)
+    assert not any(hass.services.has_service(DOMAIN, s) for s in services)
+
+
+async def test_covers_added_and_removed_without_reload(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Covers come and go without disturbing the controllers or other Covers."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    data = make_config_data(SLOW_PORT, SLOW_PORT + "0")
+    config_entry = await setup_entry(hass, data, CIW_OPTIONS)
+    assert hass.states.get("sensor.screen_image_height") is not None
+
+    data = {**data, "covers": {**data["covers"], "cover_3_id": BLIND_COVER}}
+    await apply_data(hass, config_entry, data)
+
+    assert hass.states.get("cover.blind").state != STATE_UNAVAILABLE
+    assert hass.states.get("sensor.blind_drop") is not None
+    assert len(fake_cover_manager.instances[0].tt6_covers) == 2
+
+    mask = hass.data[DOMAIN][config_entry.entry_id].nice_covers[COVER_2_ID].cover
+    covers = {id: config for id, config in data["covers"].items() if id != COVER_2_ID}
+    await apply_data(
+        hass, config_entry, {**data, "covers": covers}, {"ciw_helpers": {}}
+    )
+
+    assert hass.states.get("cover.mask") is None
+    assert hass.states.get("sensor.mask_drop") is None
+    assert hass.states.get("sensor.screen_image_height") is None
+    assert mask.observers == set()
+    assert hass.states.get("cover.screen").state != STATE_UNAVAILABLE
+    assert [e[0] for e in fake_cover_manager.events].count("open_started") == 2
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_controllers_changed_without_reload(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Only the Controller being added, changed or removed is (re)opened."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    data = make_config_data(SLOW_PORT, SLOW_PORT + "0")
+    config_entry = await setup_entry(hass, data, {})
+    fake_cover_manager.events.clear()
+
+    controllers = {
+        **data["controllers"],
+        CONTROLLER_2_ID: {"name": "Controller 2", "serial_port": SLOW_PORT + "2"},
+        "controller_3_id": {"name": "Controller 3", "serial_port": SLOW_PORT + "3"},
+    }
+    await apply_data(hass, config_entry, {**data, "controllers": controllers})
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert sorted(
+        e[1] for e in fake_cover_manager.events if e[0] == "open_started"
+    ) == [
+        SLOW_PORT + "2",
+        SLOW_PORT + "3",
+    ]
+    assert not fake_cover_manager.instances[1].is_open
+    assert hass.states.get("cover.mask").state != STATE_UNAVAILABLE
+
+    controllers = {
+        id: config for id, config in controllers.items() if id != "controller_3_id"
+    }
+    await apply_data(hass, config_entry, {**data, "controllers": controllers})
+
+    assert not fake_cover_manager.instances[3].is_open
+    assert fake_cover_manager.instances[0].is_open
+    assert fake_cover_manager.instances[2].is_open
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_pos_commands_coalesced(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Rapid position commands only send the first and the latest target."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {"settings": {"pos_command_window": 0.2}},
+    )
+    writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+
+    def set_position(position):
+        return asyncio.create_task(
+            hass.services.async_call(
+                "cover",
+                "set_cover_position",
+                {"entity_id": "cover.screen", "position": position},
+                blocking=True,
+            )
+        )
+
+    tasks = [set_position(position) for position in (10, 20, 30, 40)]
+    await asyncio.sleep(0.05)
+    assert [c.args[1] for c in writer.send_web_move_command.call_args_list] == [100]
+    await tasks[0]
+    assert not any(task.done() for task in tasks[1:])
+
+    await asyncio.gather(*tasks)
+    assert [c.args[1] for c in writer.send_web_move_command.call_args_list] == [
+        100,
+        400,
+    ]
+
+    await asyncio.sleep(0.25)
+    tasks = [set_position(position) for position in (60, 50)]
+    await asyncio.sleep(0.01)
+    await hass.services.async_call(
+        "cover", "stop_cover", {"entity_id": "cover.screen"}, blocking=True
+    )
+    await tasks[0]
+    with pytest.raises(HomeAssistantError, match="superseded"):
+        await tasks[1]
+    await asyncio.sleep(0.25)
+    assert [c.args[1] for c in writer.send_web_move_command.call_args_list] == [
+        100,
+        400,
+        600,
+    ]
+    writer.send_simple_command.assert_called_once()
+
+    writer.send_web_move_command.side_effect = OSError("write failed")
+    await asyncio.sleep(0.25)
+    tasks = [set_position(position) for position in (70, 80)]
+    with pytest.raises(OSError):
+        await tasks[0]
+    with pytest.raises(OSError):
+        await tasks[1]
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_scheduler_sends_in_priority_order(mocker) -> None:
+    """Stop goes first, then movement, then position requests."""
+    scheduler = CommandScheduler("Test")
+    sent = []
+    busy = asyncio.Event()
+
+    async def send(name):
+        sent.append(name)
+        if name == "busy":
+            await busy.wait()
+
+    tasks = [asyncio.create_task(scheduler.submit(1, "busy", partial(send, "busy")))]
+    await asyncio.sleep(0)
+    for priority, name in ((2, "poll"), (1, "move"), (0, "stop")):
+        tasks.append(
+            asyncio.create_task(scheduler.submit(priority, name, partial(send, name)))
+        )
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth == 3
+
+    busy.set()
+    await asyncio.gather(*tasks)
+    assert sent == ["busy", "stop", "move", "poll"]
+    assert scheduler.queue_depth == 0
+    await scheduler.close()
+
+
+async def test_scheduler_queue_bounded(mocker) -> None:
+    """A full queue drops a lower priority command or refuses the new one."""
+    mocker.patch.object(CommandScheduler, "MAX_QUEUE_SIZE", 2)
+    scheduler = CommandScheduler("Test")
+    sent = []
+    busy = asyncio.Event()
+
+    async def send(name):
+        sent.append(name)
+        if name == "busy":
+            await busy.wait()
+
+    def submit(priority, name, key=None):
+        return asyncio.create_task(
+            scheduler.submit(priority, key or name, partial(send, name))
+        )
+
+    tasks = [submit(1, "busy")]
+    await asyncio.sleep(0)
+    tasks += [submit(2, "poll_1"), submit(2, "poll_2"), submit(1, "move")]
+    tasks += [submit(2, "poll_3"), submit(1, "move_again", key="move")]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth == 2
+    assert scheduler.dropped_count == 2
+
+    tasks += [submit(0, "stop_1"), submit(0, "stop_2"), submit(0, "stop_3")]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth == 3
+    assert scheduler.dropped_count == 4
+
+    busy.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert sent == ["busy", "stop_1", "stop_2", "stop_3"]
+    assert results[0] is None
+    assert all(isinstance(r, HomeAssistantError) for r in results[1:6])
+    assert results[6:] == [None, None, None]
+    await scheduler.close()
+
+
+async def test_scheduler_close_while_sending() -> None:
+    """Closing the scheduler does not leave the sender of a command waiting."""
+    scheduler = CommandScheduler("Test")
+    task = asyncio.create_task(scheduler.submit(1, "move", partial(asyncio.sleep, 1)))
+    await asyncio.sleep(0.1)
+    await scheduler.close()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, 0.5)
+
+
+async def test_controller_sensors(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Each controller has diagnostic sensors for its command queue."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+
+    assert hass.states.get("sensor.controller_1_queue_depth").state == "0"
+    assert hass.states.get("sensor.controller_2_command_wait_time") is not None
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+BOTH_COVERS_PRESET_OPTIONS = {
+    "ciw_helpers": {},
+    "presets": {
+        PRESET_1_ID: {
+            "name": "Preset 1",
+            "drops": [
+                {"cover": COVER_1_ID, "drop": 1.8},
+                {"cover": COVER_2_ID, "drop": 0.25},
+            ],
+        }
+    },
+}
+
+
+async def test_preset_applied_to_controllers_concurrently(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """A slow controller does not hold up the commands for another."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        BOTH_COVERS_PRESET_OPTIONS,
+    )
+    screen_writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+    mask_writer = fake_cover_manager.instances[1].tt6_covers[0].writer
+    screen_written = asyncio.Event()
+
+    async def write_slowly(*args):
+        await screen_written.wait()
+
+    screen_writer.send_web_move_command.side_effect = write_slowly
+
+    task = asyncio.create_task(
+        hass.services.async_call(
+            DOMAIN, "apply_preset", {"name": "Preset 1"}, blocking=True
+        )
+    )
+    await asyncio.sleep(0.05)
+    mask_writer.send_web_move_command.assert_called_once_with(
+        mask_writer.send_web_move_command.call_args.args[0], 500
+    )
+    assert not task.done()
+
+    screen_written.set()
+    await task
+    screen_writer.send_web_move_command.assert_called_once()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_preset_reports_failed_covers(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Covers that cannot be moved are reported once the others have been."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, LATE_PORT),
+        {**BOTH_COVERS_PRESET_OPTIONS, "settings": {"background_connect": True}},
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    with pytest.raises(HomeAssistantError, match="Mask"):
+        await hass.services.async_call(
+            DOMAIN, "apply_preset", {"name": "Preset 1"}, blocking=True
+        )
+
+    screen_writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+    screen_writer.send_web_move_command.assert_called_once()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_presets_compiled(
+    hass: HomeAssistant, fake_cover_manager, mocker, caplog
+) -> None:
+    """Presets are resolved to commands grouped by controller at setup."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    options = {
+        "ciw_helpers": {},
+        "presets": {
+            PRESET_1_ID: {
+                "name": "Preset 1",
+                "drops": [
+                    {"cover": COVER_1_ID, "drop": 1.8},
+                    {"cover": COVER_2_ID, "drop": 0.25},
+                    {"cover": "unknown_cover_id", "drop": 0.0},
+                    {"cover": COVER_2_ID, "drop": 1.0},
+                ],
+            }
+        },
+    }
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), options
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+
+    groups = nd.presets["Preset 1"]
+    assert [
+        [(nice_cover.cover.name, pos) for nice_cover, pos in group]
+        for group in groups.values()
+    ] == [[("Screen", 0)], [("Mask", 500)]]
+    assert list(groups.keys()) == [
+        nd.controllers[CONTROLLER_1_ID],
+        nd.controllers[CONTROLLER_2_ID],
+    ]
+    assert "unknown Cover unknown_cover_id" in caplog.text
+    assert "drop 1.0 for Mask is outside 0 to 0.5" in caplog.text
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_move_covers(hass: HomeAssistant, fake_cover_manager, mocker) -> None:
+    """Many covers can be moved by drop percent or absolute drop at once."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    screen_writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+    mask_writer = fake_cover_manager.instances[1].tt6_covers[0].writer
+
+    await hass.services.async_call(
+        DOMAIN,
+        "move_covers",
+        {
+            "covers": [
+                {"entity_id": "cover.screen", "drop_percent": 25.0},
+                {"entity_id": "cover.mask", "drop": 0.25},
+            ]
+        },
+        blocking=True,
+    )
+    assert screen_writer.send_web_move_command.call_args.args[1] == 250
+    assert mask_writer.send_web_move_command.call_args.args[1] == 500
+
+    with pytest.raises(HomeAssistantError, match="not a Nice Cover"):
+        await hass.services.async_call(
+            DOMAIN,
+            "move_covers",
+            {"covers": [{"entity_id": "cover.unknown", "drop": 0.25}]},
+            blocking=True,
+        )
+    with pytest.raises(HomeAssistantError, match="maximum drop"):
+        await hass.services.async_call(
+            DOMAIN,
+            "move_covers",
+            {"covers": [{"entity_id": "cover.mask", "drop": 1.0}]},
+            blocking=True,
+        )
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_move_and_wait(hass: HomeAssistant, fake_cover_manager, mocker) -> None:
+    """The service returns once the cover is at rest near the target."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {"settings": {"pos_command_window": 0}},
+    )
+    screen = hass.data[DOMAIN][config_entry.entry_id].nice_covers[COVER_1_ID].cover
+    screen_writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+    await screen.set_idle()
+
+    call = asyncio.create_task(
+        hass.services.async_call(
+            DOMAIN,
+            "move_and_wait",
+            {"entity_id": "cover.screen", "drop_percent": 25.0},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    await asyncio.sleep(0.01)
+    assert screen_writer.send_web_move_command.call_args.args[1] == 250
+    await screen.set_pos(252)
+    await asyncio.sleep(0.01)
+    assert not call.done()
+    await screen.set_idle()
+    response = await call
+    assert response["entity_id"] == "cover.screen"
+    assert response["drop_percent"] == 25.2
+    assert response["elapsed"] >= 0.0
+    assert response["timed_out"] is False
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "move_and_wait",
+        {"entity_id": "cover.screen", "drop_percent": 75.0, "timeout": 1},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["drop_percent"] == 25.2
+    assert response["elapsed"] >= 1.0
+    assert response["timed_out"] is True
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_set_aspect_ratio(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """The screen and mask are moved to show the requested aspect ratio."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {**CIW_OPTIONS, "settings": {"pos_command_window": 0}},
+    )
+    screen_writer = fake_cover_manager.instances[0].tt6_covers[0].writer
+    mask_writer = fake_cover_manager.instances[1].tt6_covers[0].writer
+
+    # Image height for 2.35:1 is 1.57 * (16 / 9) / 2.35 = 1.1877
+    # The image is aligned with the top of the image area at 1.8 - 0.05 - 1.57
+    await hass.services.async_call(
+        DOMAIN,
+        "set_aspect_ratio",
+        {"name": "CIW Helper", "aspect_ratio": 2.35, "baseline": "top"},
+        blocking=True,
+    )
+    assert screen_writer.send_web_move_command.call_args.args[1] == 212
+    assert mask_writer.send_web_move_command.call_args.args[1] == 640
+
+    # The mask cannot reach the top of a bottom aligned image so it moves up
+    await hass.services.async_call(
+        DOMAIN,
+        "set_image_height",
+        {"name": "CIW Helper", "image_height": 1.2},
+        blocking=True,
+    )
+    assert mask_writer.send_web_move_command.call_args.args[1] == 0
+    assert screen_writer.send_web_move_command.call_args.args[1] == 28
+
+    with pytest.raises(HomeAssistantError, match="must be more than"):
+        await hass.services.async_call(
+            DOMAIN,
+            "set_image_height",
+            {"name": "CIW Helper", "image_height": 1.6},
+            blocking=True,
+        )
+    with pytest.raises(HomeAssistantError, match="not a CIW Helper"):
+        await hass.services.async_call(
+            DOMAIN,
+            "set_aspect_ratio",
+            {"name": "Unknown", "aspect_ratio": 2.35},
+            blocking=True,
+        )
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_ciw_engine(hass: HomeAssistant, fake_cover_manager, mocker) -> None:
+    """The CIW sensors read the values computed by the engine."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {**CIW_OPTIONS, "settings": {"moving_write_rate": 0}},
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID].cover
+    mask = nd.nice_covers[COVER_2_ID].cover
+    assert nd.ciw_engine in screen.observers
+    assert nd.ciw_engine in mask.observers
+
+    await screen.set_pos(0)
+    await mask.set_pos(0)
+    await hass.async_block_till_done()
+
+    # Image height is 1.8 - 0.05 - 0.5 = 1.25 at a width of 1.57 * 16 / 9
+    values = nd.ciw_helpers[CIW_HELPER_ID].values
+    assert values.image_height == pytest.approx(1.25)
+    assert values.aspect_ratio == pytest.approx(1.57 * 16 / 9 / 1.25)
+    state = hass.states.get("sensor.screen_image_height")
+    assert float(state.state) == pytest.approx(1.25)
+
+    await screen.set_pos(1000)
+    await hass.async_block_till_done()
+    assert nd.ciw_helpers[CIW_HELPER_ID].values.image_height is None
+    assert hass.states.get("sensor.screen_image_aspect_ratio").state == "unknown"
+
+    await apply_options(hass, config_entry, {"ciw_helpers": {}, "presets": {}})
+    assert nd.ciw_engine not in screen.observers
+    assert nd.ciw_engine not in mask.observers
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_ciw_engine_skips_unchanged_positions(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """A helper is only recomputed and notified when a position changes."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), CIW_OPTIONS
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID].cover
+    mask = nd.nice_covers[COVER_2_ID].cover
+    handler = AsyncMock()
+    nd.ciw_helpers[CIW_HELPER_ID].attach(EntityUpdater(handler))
+
+    await screen.set_pos(0)
+    assert handler.await_count == 1
+    await screen.notify_observers()
+    await mask.set_pos(mask.pos)
+    assert handler.await_count == 1
+    await mask.set_pos(0)
+    assert handler.await_count == 2
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_moving_state_writes_throttled(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """State writes are rate limited while moving but not once at rest."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {**CIW_OPTIONS, "settings": {"moving_write_rate": 10.0}},
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID].cover
+    await asyncio.sleep(0.15)
+
+    for pos in (400, 300, 200):
+        await screen.set_pos(pos)
+        await hass.async_block_till_done()
+    assert hass.states.get("cover.screen").attributes["current_position"] == 40
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.08
+
+    await asyncio.sleep(0.15)
+    assert hass.states.get("cover.screen").attributes["current_position"] == 20
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.44
+
+    await screen.set_pos(0)
+
+    await hass.async_block_till_done()
+    await screen.set_idle()
+    await hass.async_block_till_done()
+    assert hass.states.get("cover.screen").attributes["current_position"] == 0
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.8
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_unchanged_state_not_written(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """A state is only written when it changes by more than the deadband."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {"settings": {"moving_write_rate": 0, "sensor_deadband": 0.1}},
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID].cover
+    write_spy = mocker.spy(Entity, "async_write_ha_state")
+
+    await screen.notify_observers()
+
+    await hass.async_block_till_done()
+    assert write_spy.call_count == 0
+
+    await screen.set_pos(400)
+
+    await hass.async_block_till_done()
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.08
+    await screen.set_pos(370)
+    await hass.async_block_till_done()
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.08
+    await screen.set_idle()
+    await hass.async_block_till_done()
+    assert float(hass.states.get("sensor.screen_drop").state) == 1.134
+
+    # The time to target alone does not make the state of the Cover change
+    travel = nd.nice_covers[COVER_1_ID].travel
+    travel.rates.update({"up": 100.0, "down": 100.0})
+    travel.target_pos = 0
+    await screen.set_pos(300)
+    await screen.set_pos(250)
+    await hass.async_block_till_done()
+    state = hass.states.get("cover.screen")
+    await asyncio.sleep(0.05)
+    await screen.notify_observers()
+    await hass.async_block_till_done()
+    assert hass.states.get("cover.screen") is state
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_entity_dispatcher(hass: HomeAssistant, caplog) -> None:
+    """Handlers run in their own tasks and are isolated from each other."""
+    observable = AsyncObservable()
+    dispatcher = EntityDispatcher(observable)
+    release = asyncio.Event()
+    slow = AsyncMock(side_effect=release.wait)
+    failing = AsyncMock(side_effect=RuntimeError("boom"))
+    ok = AsyncMock()
+    dispatcher.add(hass, "sensor.slow", slow)
+    dispatcher.add(hass, "sensor.failing", failing)
+    remove_ok = dispatcher.add(hass, "sensor.ok", ok)
+
+    await observable.notify_observers()
+    await observable.notify_observers()
+    assert slow.await_count == 0
+    await asyncio.sleep(0)
+    assert slow.await_count == 1
+    assert ok.await_count == 1
+    assert failing.await_count == 1
+    assert "Error updating sensor.failing" in caplog.text
+
+    await observable.notify_observers()
+    await asyncio.sleep(0)
+    assert slow.await_count == 1
+    assert ok.await_count == 2
+
+    release.set()
+    await hass.async_block_till_done()
+    assert slow.await_count == 2
+    handler_times = dispatcher.handler_times
+    assert handler_times.keys() == {"sensor.slow", "sensor.failing", "sensor.ok"}
+    assert handler_times["sensor.slow"]["count"] == 2
+    assert handler_times["sensor.ok"]["count"] == 2
+    assert handler_times["sensor.failing"]["count"] == 2
+    assert (
+        0.0 <= handler_times["sensor.ok"]["max"] <= handler_times["sensor.ok"]["total"]
+    )
+
+    remove_ok()
+    await observable.notify_observers()
+    await hass.async_block_till_done()
+    assert ok.await_count == 2
+    dispatcher.close()
+    assert dispatcher not in observable.observers
+
+
+async def test_diagnostics(hass: HomeAssistant, fake_cover_manager, mocker) -> None:
+    """The handler times of each Cover are included in the diagnostics."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    await nd.nice_covers[COVER_1_ID].cover.set_pos(400)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    assert diagnostics["controllers"][CONTROLLER_1_ID]["is_connected"] is True
+    screen = diagnostics["covers"][COVER_1_ID]
+    assert screen["state_reported"] is True
+    assert screen["handler_times"]["cover.screen"]["count"] >= 1
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_recorder_friendly_entities(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """Fast changing attributes are unrecorded; the statistics sensor is opt in."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    assert "drop_percent" in NiceCover._unrecorded_attributes
+    entry = er.async_get(hass).async_get("sensor.screen_drop_statistics")
+    assert entry is not None
+    assert entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+    assert hass.states.get("sensor.screen_drop_statistics") is None
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_optimistic_state(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """The target is shown straight away and then reconciled or rolled back."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {"settings": {"optimistic": True, "moving_write_rate": 0}},
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID].cover
+    assert hass.states.get("cover.screen").attributes["current_position"] == 50
+
+    await hass.services.async_call(
+        "cover",
+        "set_cover_position",
+        {"entity_id": "cover.screen", "position": 80},
+        blocking=True,
+    )
+    state = hass.states.get("cover.screen")
+    assert state.state == "opening"
+    assert state.attributes["current_position"] == 80
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    assert hass.states.get("cover.screen").attributes["current_position"] == 50
+
+    await hass.services.async_call(
+        "cover",
+        "set_cover_position",
+        {"entity_id": "cover.screen", "position": 20},
+        blocking=True,
+    )
+    state = hass.states.get("cover.screen")
+    assert state.state == "closing"
+    assert state.attributes["current_position"] == 20
+
+    tt6_cover = fake_cover_manager.instances[0].tt6_covers[0]
+    await tt6_cover.handle_response_message(PctAckResponse(tt6_cover.tt_addr, 200))
+    await hass.async_block_till_done()
+    state = hass.states.get("cover.screen")
+    assert state.state == "closing"
+    assert state.attributes["current_position"] == 20
+
+    await screen.set_pos(450)
+    await hass.async_block_till_done()
+    state = hass.states.get("cover.screen")
+    assert state.state == "closing"
+    assert state.attributes["current_position"] == 45
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_unreported_position_is_unknown(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """A move is not judged against the default pos of an unreported Cover."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(
+                    "cover.mask",
+                    "open",
+                    {"current_position": 40, "drop_percent": 40.5},
+                ),
+                {},
+            ),
+        ],
+    )
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, QUIET_PORT),
+        {"settings": {"optimistic": True, "moving_write_rate": 0}},
+    )
+
+    await hass.services.async_call(
+        "cover", "open_cover", {"entity_id": "cover.mask"}, blocking=True
+    )
+    state = hass.states.get("cover.mask")
+    assert state.state == "open"
+    assert state.attributes["current_position"] == 100
+    assert state.attributes["time_to_target"] is None
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+    state = hass.states.get("cover.mask")
+    assert state.attributes["current_position"] == 40
+    assert state.attributes["stale"] is True
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "move_and_wait",
+        {"entity_id": "cover.mask", "drop_percent": 100.0, "timeout": 1},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["timed_out"] is True
+
+    # An Ack does not report the position
+    tt6_cover = fake_cover_manager.instances[1].tt6_covers[0]
+    await tt6_cover.handle_response_message(PctAckResponse(tt6_cover.tt_addr, 200))
+    await hass.async_block_till_done()
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    assert nd.nice_covers[COVER_2_ID].state_reported is False
+    assert hass.states.get("cover.mask").attributes["current_position"] == 40
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_motion_poller(mocker) -> None:
+    """A Cover is polled while moving and comes to rest promptly once stopped."""
+    mocker.patch.object(MotionPoller, "INTERVAL", 0.05)
+    mocker.patch.object(Cover, "MOVEMENT_THRESHOLD_INTERVAL", 0.2)
+    cover = Cover("Screen", 2.0)
+    motor_pos = 800
+
+    async def poll():
+        await cover.set_pos(motor_pos)  # As a response to a position request
+        return True
+
+    poll = AsyncMock(side_effect=poll)
+    budget = PollBudget(0.0)
+    poller = MotionPoller(cover, poll, budget)
+
+    await cover.set_pos(900)
+    assert not poller.is_polling
+    await cover.set_idle()
+
+    budget.rate = 1000.0
+    await cover.set_pos(800)
+    assert poller.is_polling
+    for motor_pos in (700, 600, 500):
+        await asyncio.sleep(0.06)
+        assert cover.is_going_down
+    assert poll.await_count >= 2
+
+    # The motor has stopped at 500
+    await asyncio.wait_for(cover.wait_idle(), 0.6)
+    assert not poller.is_polling
+    assert cover.pos == 500
+    polls = poll.await_count
+    await asyncio.sleep(0.1)
+    assert poll.await_count == polls
+    await poller.close()
+    await cover.stop_notifier()
+
+
+async def test_poll_budget() -> None:
+    """Polls share the rate of the budget."""
+    budget = PollBudget(20.0)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(budget.acquire() for _ in range(4)))
+    assert loop.time() - start >= 0.15
+
+
+async def test_travel_model(mocker) -> None:
+    """The travel rates are learnt from the reports while moving."""
+    now = mocker.patch("custom_components.nice.time.monotonic", return_value=0.0)
+    cover = Cover("Screen", 2.0)
+    travel = TravelModel(cover)
+    travel.target_pos = 0
+    assert travel.time_to_target() is None
+
+    for t, pos in ((0.0, 900), (0.5, 800), (1.0, 700), (1.5, 600), (2.0, 550)):
+        now.return_value = t
+        await cover.set_pos(pos)
+    assert travel.rates == {"up": None, "down": pytest.approx(170.0)}
+    assert travel.time_to_target() == pytest.approx(550 / 170.0)
+
+    now.return_value = 2.5
+    assert travel.expected_pos() == pytest.approx(465.0)
+    now.return_value = 10.0
+    assert travel.expected_pos() == 0.0
+    assert travel.time_to_target() == 0.0
+
+    await cover.set_idle()
+    assert travel.target_pos is None
+    assert travel.time_to_target() == 0.0
+    await cover.stop_notifier()
+
+
+async def test_travel_rates_persisted(
+    hass: HomeAssistant, hass_storage, fake_cover_manager, mocker
+) -> None:
+    """The learnt travel rates are restored and saved."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        options={},
+    )
+    hass_storage[f"nice.{config_entry.entry_id}.travel"] = {
+        "version": 1,
+        "data": {COVER_1_ID: {"up": 100.0, "down": 120.0}},
+    }
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    travel = hass.data[DOMAIN][config_entry.entry_id].nice_covers[COVER_1_ID].travel
+    assert travel.rates == {"up": 100.0, "down": 120.0}
+
+    travel.rates["up"] = 90.0
+    travel.on_change()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+    await hass.async_block_till_done()
+    saved = hass_storage[f"nice.{config_entry.entry_id}.travel"]["data"]
+    assert saved[COVER_1_ID] == {"up": 90.0, "down": 120.0}
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_coordinated_moves(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """The Covers of a coordinated move are staggered to arrive together."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, SLOW_PORT + "0"),
+        {"settings": {"coordinated_moves": True, "pos_command_window": 0}},
+    )
+    nd = hass.data[DOMAIN][config_entry.entry_id]
+    screen = nd.nice_covers[COVER_1_ID]
+    mask = nd.nice_covers[COVER_2_ID]
+    loop = asyncio.get_running_loop()
+    sent_at = {}
+    for i in range(2):
+        writer = fake_cover_manager.instances[i].tt6_covers[0].writer
+
+        async def record(tt_addr, pos, i=i):
+            sent_at[i] = loop.time()
+
+        writer.send_web_move_command.side_effect = record
+
+    # Rates are not known yet so the Covers start together
+    start = loop.time()
+    await async_send_pos_commands(group_by_controller([(screen, 0), (mask, 400)]))
+    assert max(sent_at.values()) - start < 0.1
+
+    screen.travel.rates.update({"up": 2000.0, "down": 2000.0})
+    mask.travel.rates.update({"up": 2000.0, "down": 2000.0})
+    start = loop.time()
+    await async_send_pos_commands(group_by_controller([(screen, 0), (mask, 400)]))
+    assert sent_at[0] - start < 0.1
+    assert sent_at[1] - start == pytest.approx(0.2, abs=0.1)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_no_motion_events_on_connect(
+    hass: HomeAssistant, fake_cover_manager, mocker
+) -> None:
+    """The first position reported by a Cover is not taken for a move."""
+    mocker.patch.object(Cover, "MOVEMENT_THRESHOLD_INTERVAL", 0.2)
+    started = async_capture_events(hass, "nice_motion_started")
+    finished = async_capture_events(hass, "nice_motion_finished")
+    config_entry = await setup_entry(
+        hass,
+        make_config_data(SLOW_PORT, LATE_PORT),
+        {"settings": {"background_connect": True}},
+    )
+    assert hass.states.get("cover.mask").state == STATE_UNAVAILABLE
+
+    fake_cover_manager.late_port_ready.set()
+    await asyncio.sleep(0.5)
+    await hass.async_block_till_done()
+    assert hass.states.get("cover.mask").state != STATE_UNAVAILABLE
+    assert started == []
+    assert finished == []
+
+    mask = hass.data[DOMAIN][config_entry.entry_id].nice_covers[COVER_2_ID].cover
+    await mask.set_pos(400)
+    await hass.async_block_till_done()
+    assert len(started) == 1
+    assert started[0].data["start_position"] == REPORTED_POS / 10.0
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_motion_events(hass: HomeAssistant, fake_cover_manager, mocker) -> None:
+    """An event is fired when a Cover starts to move and when it stops."""
+    mocker.patch.object(NiceControllerWrapper, "SYNC_TIMEOUT", 0.1)
+    config_entry = await setup_entry(
+        hass, make_config_data(SLOW_PORT, SLOW_PORT + "0"), {}
+    )
+    screen = hass.data[DOMAIN][config_entry.entry_id].nice_covers[COVER_1_ID].cover
+    await screen.set_idle()
+    await hass.async_block_till_done()
+    started = async_capture_events(hass, "nice_motion_started")
+    finished = async_capture_events(hass, "nice_motion_finished")
+
+    for pos in (450, 400, 350):
+        await screen.set_pos(pos)
+        await hass.async_block_till_done()
+    assert len(started) == 1
+    assert started[0].data == {
+        "entity_id": "cover.screen",
+        "name": "Screen",
+        "start_position": 50.0,
+        "direction": "down",
+    }
+    assert len(finished) == 0
+
+    await screen.set_idle()
+    await hass.async_block_till_done()
+    assert len(started) == 1
+    assert len(finished) == 1
+    assert finished[0].data["start_position"] == 50.0
+    assert finished[0].data["end_position"] == 35.0
+    assert finished[0].data["duration"] >= 0.0
+    assert await hass.config_entries.async_unload(config_entry.entry_id)